@@ -0,0 +1,79 @@
+__author__ = 'deadblue'
+
+# Per-response time of rendering a list of dataclass records with the `json`
+# renderer and `fast_json` renderer under both backends.
+
+import datetime
+import statistics
+import time
+from dataclasses import dataclass
+from enum import Enum
+from typing import Any, Callable, List
+from uuid import UUID, uuid4
+
+from flask import Flask
+
+from boostflask.view.renderer import JsonRenderer, json, orjson
+
+
+class Status(Enum):
+    ACTIVE = 'active'
+    DISABLED = 'disabled'
+
+
+@dataclass
+class Record:
+    id: UUID
+    name: str
+    score: float
+    tags: List[str]
+    status: Status
+    created_at: datetime.datetime
+
+
+_RECORDS = [
+    Record(
+        id=uuid4(), name=f'record-{index}', score=index * 0.5,
+        tags=['a', 'b', 'c'],
+        status=Status.ACTIVE if index % 2 == 0 else Status.DISABLED,
+        created_at=datetime.datetime(2024, 1, 1, 12, 0, index % 60)
+    ) for index in range(100)
+]
+
+# Plain dicts of the same shape, the only input stdlib `json` renderer accepts
+_DICTS = [
+    {
+        'id': str(r.id), 'name': r.name, 'score': r.score, 'tags': r.tags,
+        'status': r.status.value, 'created_at': r.created_at.isoformat()
+    } for r in _RECORDS
+]
+
+
+def _measure(render: Callable[[Any], Any], result: Any, count: int) -> float:
+    start_time = time.perf_counter()
+    for _ in range(count):
+        render(result)
+    return (time.perf_counter() - start_time) / count * 1e6
+
+
+def _main():
+    cases = [
+        ('json, dicts', json, _DICTS),
+        ('fast_json stdlib, dicts', JsonRenderer('stdlib'), _DICTS),
+        ('fast_json stdlib, dataclasses', JsonRenderer('stdlib'), _RECORDS),
+    ]
+    if orjson is not None:
+        cases.extend([
+            ('fast_json orjson, dicts', JsonRenderer('orjson'), _DICTS),
+            ('fast_json orjson, dataclasses', JsonRenderer('orjson'), _RECORDS),
+        ])
+    app = Flask(__name__)
+    with app.app_context():
+        for name, render, result in cases:
+            _measure(render, result, 200)
+            samples = [_measure(render, result, 1000) for _ in range(5)]
+            print(f'{name}: {statistics.median(samples):.2f} us/op (median of 5)')
+
+
+if __name__ == '__main__':
+    _main()
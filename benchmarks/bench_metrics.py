@@ -0,0 +1,73 @@
+__author__ = 'deadblue'
+
+# Per-request overhead of recording request phase metrics, and cost of a
+# single histogram observation, including shard churn from short threads.
+
+import statistics
+import threading
+import time
+
+from flask import Flask
+
+from boostflask.metrics import Histogram, RequestMetrics
+from boostflask.view import as_view
+from boostflask.view.renderer import fast_json
+
+
+@as_view('/plain', renderer=fast_json)
+def plain(a: int = 0):
+    return {'a': a}
+
+
+@as_view('/timed', renderer=fast_json)
+def timed(a: int = 0):
+    return {'a': a}
+
+
+def _measure_view(view, count: int) -> float:
+    start_time = time.perf_counter()
+    for _ in range(count):
+        view()
+    return (time.perf_counter() - start_time) / count * 1e6
+
+
+def _measure_observe(histogram: Histogram, count: int) -> float:
+    start_time = time.perf_counter()
+    for _ in range(count):
+        histogram.observe(0.003)
+    return (time.perf_counter() - start_time) / count * 1e9
+
+
+def _churn(histogram: Histogram, threads: int) -> int:
+    def run():
+        for _ in range(100):
+            histogram.observe(0.003)
+    for _ in range(threads):
+        t = threading.Thread(target=run)
+        t.start()
+        t.join()
+    return len(histogram._shards)
+
+
+def _main():
+    timed.attach_metrics(RequestMetrics())
+    app = Flask(__name__)
+    with app.test_request_context('/?a=1'):
+        for view in (plain, timed):
+            _measure_view(view, 20000)
+        plain_samples = [_measure_view(plain, 50000) for _ in range(5)]
+        timed_samples = [_measure_view(timed, 50000) for _ in range(5)]
+    plain_us = statistics.median(plain_samples)
+    timed_us = statistics.median(timed_samples)
+    print(f'plain: {plain_us:.2f} us/op, timed: {timed_us:.2f} us/op, '
+          f'overhead: {timed_us - plain_us:.2f} us/op (median of 5)')
+    histogram = Histogram()
+    samples = [_measure_observe(histogram, 200000) for _ in range(5)]
+    print(f'observe: {statistics.median(samples):.0f} ns/op (median of 5)')
+    shards = _churn(histogram, 1000)
+    print(f'shards after 1000 short threads: {shards}, '
+          f'count: {histogram.snapshot().count}')
+
+
+if __name__ == '__main__':
+    _main()
@@ -0,0 +1,54 @@
+__author__ = 'deadblue'
+
+# Per-request overhead of creating a context through ObjectPool.
+
+import statistics
+import time
+
+from boostflask.context import RequestContext
+from boostflask.pool import ObjectPool
+
+
+class Dependency:
+
+    def __init__(self) -> None:
+        pass
+
+
+class Service:
+
+    def __init__(
+            self, 
+            dep: Dependency, 
+            pool: ObjectPool, 
+            size: int = 3, 
+            name: str = 'x'
+        ) -> None:
+        pass
+
+
+class Context(RequestContext):
+
+    def __init__(self, svc: Service, dep: Dependency, limit: int = 10) -> None:
+        pass
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        pass
+
+
+def _measure(pool: ObjectPool, count: int) -> float:
+    start_time = time.perf_counter()
+    for _ in range(count):
+        pool.create(Context)
+    return (time.perf_counter() - start_time) / count * 1e6
+
+
+def _main():
+    pool = ObjectPool({'__main__': {'Context': {'limit': 5}}})
+    pool.create(Context)
+    samples = [_measure(pool, 100000) for _ in range(5)]
+    print(f'create: {statistics.median(samples):.2f} us/op (median of 5)')
+
+
+if __name__ == '__main__':
+    _main()
@@ -0,0 +1,49 @@
+__author__ = 'deadblue'
+
+# Per-request time of resolving ten querystring arguments.
+
+import statistics
+import time
+
+from flask import Flask
+
+from boostflask.view.resolver import StandardResolver
+
+
+def handler(
+        a_one: int, 
+        b_two: str, 
+        c_three: float, 
+        d_four: bool, 
+        e_five: int, 
+        f: str, 
+        g: int, 
+        h: str, 
+        i_x: int, 
+        j: str = 'x'
+    ):
+    pass
+
+
+_QUERY = 'aOne=1&bTwo=x&cThree=1.5&dFour=true&eFive=5&f=q&g=7&h=z&iX=9&j=w'
+
+
+def _measure(resolver: StandardResolver, count: int) -> float:
+    start_time = time.perf_counter()
+    for _ in range(count):
+        resolver.resolve_args()
+    return (time.perf_counter() - start_time) / count * 1e6
+
+
+def _main():
+    resolver = StandardResolver()
+    resolver.parse_handler(handler)
+    app = Flask(__name__)
+    with app.test_request_context(f'/?{_QUERY}'):
+        print(resolver.resolve_args())
+        samples = [_measure(resolver, 20000) for _ in range(5)]
+    print(f'resolve: {statistics.median(samples):.2f} us/op (median of 5)')
+
+
+if __name__ == '__main__':
+    _main()
@@ -0,0 +1,129 @@
+__author__ = 'deadblue'
+
+# Stress ObjectPool.get from many threads:
+#   - each singleton must be constructed exactly once;
+#   - concurrent lookups on a circular dependency must raise
+#     CircularReferenceError instead of deadlocking.
+
+import sys
+import threading
+import time
+from collections import Counter
+from typing import List, Type
+
+from boostflask.pool import CircularReferenceError, ObjectPool
+
+
+_THREADS = 64
+_ROUNDS = 100
+
+_constructions = Counter()
+_counter_lock = threading.Lock()
+
+
+def _count(name: str):
+    with _counter_lock:
+        _constructions[name] += 1
+
+
+def _make_service(index: int) -> Type:
+    class Service:
+        def __init__(self) -> None:
+            _count(f'Service{index}')
+            # Expensive construction widens the race window
+            time.sleep(0.01)
+    Service.__name__ = Service.__qualname__ = f'Service{index}'
+    return Service
+
+
+_services = [_make_service(index) for index in range(10)]
+
+
+class Facade:
+
+    def __init__(self, first: _services[0], second: _services[1]) -> None:
+        _count('Facade')
+
+
+def _hammer() -> bool:
+    pool = ObjectPool()
+    barrier = threading.Barrier(_THREADS)
+    errors: List[BaseException] = []
+    def run():
+        barrier.wait()
+        try:
+            for _ in range(_ROUNDS):
+                for service_cls in _services:
+                    pool.get(service_cls)
+                pool.get(Facade)
+        except BaseException as e:
+            errors.append(e)
+    threads = [threading.Thread(target=run) for _ in range(_THREADS)]
+    for t in threads: t.start()
+    for t in threads: t.join()
+    duplicated = {
+        name: count for name, count in _constructions.items() if count != 1
+    }
+    print(f'hammer: {len(_constructions)} classes, duplicated: {duplicated}, errors: {errors}')
+    return len(duplicated) == 0 and len(errors) == 0 and len(_constructions) == 11
+
+
+class SlowA:
+
+    def __init__(self) -> None:
+        time.sleep(0.1)
+
+
+class SlowB:
+
+    def __init__(self) -> None:
+        time.sleep(0.1)
+
+
+class CycleA:
+
+    def __init__(self, slow: SlowA, other: 'CycleB') -> None:
+        pass
+
+
+class CycleB:
+
+    def __init__(self, slow: SlowB, other: CycleA) -> None:
+        pass
+
+
+# Forward reference is not resolved by ObjectPool
+CycleA.__init__.__annotations__['other'] = CycleB
+
+
+def _concurrent_cycle() -> bool:
+    pool = ObjectPool()
+    barrier = threading.Barrier(2)
+    results: List[str] = []
+    def run(obj_cls: Type):
+        barrier.wait()
+        try:
+            pool.get(obj_cls)
+            results.append('built')
+        except CircularReferenceError:
+            results.append('cycle')
+    threads = [
+        threading.Thread(target=run, args=(obj_cls, ), daemon=True)
+        for obj_cls in (CycleA, CycleB)
+    ]
+    for t in threads: t.start()
+    for t in threads: t.join(5)
+    deadlocked = any(t.is_alive() for t in threads)
+    print(f'concurrent cycle: results: {results}, deadlocked: {deadlocked}')
+    return not deadlocked and results == ['cycle', 'cycle']
+
+
+def _main():
+    passed = _hammer()
+    passed = _concurrent_cycle() and passed
+    print('PASSED' if passed else 'FAILED')
+    sys.exit(0 if passed else 1)
+
+
+if __name__ == '__main__':
+    _main()
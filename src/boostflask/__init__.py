@@ -8,7 +8,7 @@ from .context import (
     find_context
 )
 from .error_handler import ErrorHandler
-from .task import as_task
+from .task import as_task, as_batch_task
 
 __all__ = [
     'Bootstrap',
@@ -20,5 +20,6 @@ __all__ = [
     
     'ErrorHandler',
 
-    'as_task'
+    'as_task',
+    'as_batch_task'
 ]
\ No newline at end of file
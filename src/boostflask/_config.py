@@ -12,6 +12,10 @@ class ConfigManager:
     def __init__(self, data: Dict[str, Any] | None) -> None:
         self._data = data
 
+    @property
+    def data(self) -> Dict[str, Any] | None:
+        return self._data
+
     def _get_module_config(self, mdl_name: str) -> Dict[str, Any] | None:
         if self._data is None:
             return None
@@ -0,0 +1,134 @@
+__author__ = 'deadblue'
+
+import json
+import logging
+import os
+from dataclasses import asdict, dataclass
+from typing import Dict, List, Sequence, Tuple
+
+
+_logger = logging.getLogger(__name__)
+
+_MANIFEST_VERSION = 1
+
+
+@dataclass
+class ScanEntry:
+    """
+    A useful member found in app package.
+    """
+
+    module: str
+    """
+    Module name.
+    """
+
+    name: str
+    """
+    Member name in module.
+    """
+
+    url_path: str
+    """
+    URL path of module.
+    """
+
+
+def _stat_file(path: str) -> Tuple[int, int]:
+    st = os.stat(path)
+    return st.st_mtime_ns, st.st_size
+
+
+class RouteManifest:
+    """
+    Persistent scanning result of app package, with modification times of
+    the scanned source files and package directories.
+
+    Args:
+        path (str): Manifest file path.
+        package (str): App package name.
+    """
+
+    _path: str
+    _package: str
+
+    def __init__(self, path: str | os.PathLike, package: str) -> None:
+        self._path = os.fspath(path)
+        self._package = package
+
+    def load(self) -> List[ScanEntry] | None:
+        """
+        Load entries from manifest.
+
+        Returns:
+            List[ScanEntry] | None: Entries, None when manifest is missing or
+                stale.
+        """
+        try:
+            with open(self._path, 'r', encoding='utf-8') as fp:
+                data = json.load(fp)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError):
+            _logger.warning('Unreadable manifest: %s', self._path)
+            return None
+        if (
+            data.get('version') != _MANIFEST_VERSION or
+            data.get('package') != self._package
+        ):
+            return None
+        # Added or removed modules change mtime of directories
+        try:
+            for path, mtime in data['dirs'].items():
+                if os.stat(path).st_mtime_ns != mtime:
+                    _logger.info('Manifest is stale: %s changed', path)
+                    return None
+            for path, stat in data['sources'].items():
+                if _stat_file(path) != tuple(stat):
+                    _logger.info('Manifest is stale: %s changed', path)
+                    return None
+        except OSError:
+            _logger.info('Manifest is stale: source missing')
+            return None
+        return [ScanEntry(**entry) for entry in data['entries']]
+
+    def save(
+            self,
+            entries: Sequence[ScanEntry],
+            source_files: Sequence[str],
+            package_dirs: Sequence[str]
+        ):
+        """
+        Save entries to manifest.
+
+        Args:
+            entries (Sequence[ScanEntry]): Scanned entries.
+            source_files (Sequence[str]): All scanned source files.
+            package_dirs (Sequence[str]): All scanned package directories.
+        """
+        dirs: Dict[str, int] = {
+            path: os.stat(path).st_mtime_ns for path in package_dirs
+        }
+        sources: Dict[str, Tuple[int, int]] = {
+            path: _stat_file(path) for path in source_files
+        }
+        data = {
+            'version': _MANIFEST_VERSION,
+            'package': self._package,
+            'dirs': dirs,
+            'sources': sources,
+            'entries': [asdict(entry) for entry in entries],
+        }
+        # Write to temporary file then replace, so workers never read a
+        # partial manifest.
+        tmp_path = f'{self._path}.{os.getpid()}.tmp'
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as fp:
+                json.dump(data, fp, indent=1)
+            os.replace(tmp_path, self._path)
+        except OSError:
+            _logger.warning('Write manifest failed: %s', self._path, exc_info=True)
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
@@ -1,9 +1,10 @@
 __author__ = 'deadblue'
 
 import importlib
+import inspect
 import re
 import sys
-from typing import Dict, Sequence, Type
+from typing import Any, Dict, Sequence, Type
 from types import ModuleType
 
 
@@ -11,12 +12,20 @@ def get_class_name(cls: Type) -> str:
     return f'{cls.__module__}.{cls.__name__}'
 
 
+def is_async_callable(obj: Any) -> bool:
+    if inspect.iscoroutinefunction(obj):
+        return True
+    # Callable object with async __call__
+    return not inspect.isroutine(obj) and \
+        inspect.iscoroutinefunction(getattr(obj, '__call__', None))
+
+
 def to_camel(name: str) -> str:
     parts = name.split('_')
     if len(parts) == 1:
         return name
     return ''.join(map(
-        lambda index, name: name if index == 0 else name.capitalize(),
+        lambda item: item[1] if item[0] == 0 else item[1].capitalize(),
         enumerate(parts)
     ))
 
@@ -1,12 +1,19 @@
 __author__ = 'deadblue'
 
+import functools
 import inspect
 import logging
+import os
 import pkgutil
-from typing import Any, Dict, List, Type
+import sys
+import time
+from contextlib import nullcontext
+from typing import (
+    Any, Callable, ContextManager, Dict, List, Sequence, Set, Tuple, Type
+)
 from types import ModuleType, TracebackType
 
-from flask import Flask
+from flask import Flask, Response, request
 from flask.typing import ResponseReturnValue
 
 from .context import (
@@ -14,14 +21,20 @@ from .context import (
     CommonContext, 
     RequestContext, 
     TaskContext, 
-    _ContextManager
+    _ContextManager,
+    _ContextPlan,
+    _DeferredExit
 )
 from .error_handler import ErrorHandler
-from .pool import ObjectPool
-from .task import TaskExecutor
-from .view.base import BaseView
+from ._manifest import RouteManifest, ScanEntry
+from .metrics import RequestMetrics
+from .pool import ObjectPool, Scope
+from .profiling import StartupProfiler, StartupReport
+from .task import ProcessTaskExecutor, TaskLanes
+from .view.base import BaseView, View, _HandlerView
 from ._utils import (
     ModuleUrlResolver,
+    get_class_name,
     is_private_module,
     load_module,
     join_url_paths
@@ -31,6 +44,37 @@ from ._utils import (
 _logger = logging.getLogger(__name__)
 
 
+class _LazyView:
+    """
+    Proxy endpoint which instantiates view on first request.
+    """
+
+    _op: ObjectPool
+    _view_cls: Type[View]
+    _view: View | None = None
+    _metrics: RequestMetrics | None = None
+
+    def __init__(
+            self, 
+            op: ObjectPool, 
+            view_cls: Type[View], 
+            metrics: RequestMetrics | None = None
+        ) -> None:
+        self._op = op
+        self._view_cls = view_cls
+        self._metrics = metrics
+
+    def __call__(self, *args: Any, **kwargs: Any) -> Any:
+        view = self._view
+        if view is None:
+            # Object pool instantiates view exactly once under concurrency
+            view = self._op.get(self._view_cls)
+            if self._metrics is not None:
+                view.attach_metrics(self._metrics)
+            self._view = view
+        return view(*args, **kwargs)
+
+
 class Bootstrap:
     """Flask app bootstrap.
 
@@ -38,20 +82,69 @@ class Bootstrap:
         app (Flask): Flask app.
         app_conf (ConfigType | None): Configuration for app.
         url_prefix (str | None): URL prefix for all views.
+        warm_up (bool): Instantiate views, error handlers and their dependencies
+            in parallel before registering them.
+        warm_up_workers (int | None): Maximum number of warm-up threads.
+        shutdown_timeout (float | None): Deadline in seconds for closing 
+            objects when exiting.
+        lazy_views (bool): Register view classes which declare `url_rule` as 
+            class attribute without instantiating them, each view and its 
+            dependencies are instantiated on its first request.
+        hot_views (Sequence[str] | None): Endpoints of views that are 
+            instantiated at startup in lazy mode.
+        manifest (str | PathLike | None): Path of route manifest. Scanning 
+            result is saved to it, and later boots import only the modules 
+            listed in it, until any scanned source is changed.
+        profile (bool): Profile startup, the report is available from 
+            `startup_report` after entering.
+        profile_memory (bool): Trace memory allocation deltas when profiling.
+        profile_path (str | PathLike | None): Path to dump startup report as 
+            JSON, implies profiling.
+        metrics (bool): Record per-endpoint histograms of request phases, 
+            which can be exposed by a `MetricsView`.
     """
 
     _app: Flask
     _op: ObjectPool
     _ctx_types: List[Type[BaseContext]]
+    _request_ctx_plan: _ContextPlan
     
     _url_prefix: str | None = None
 
+    _warm_up: bool = False
+    _warm_up_workers: int | None = None
+    _warm_up_timings: Dict[str, float] | None = None
+
+    _shutdown_timeout: float | None = None
+
+    _lazy_views: bool = False
+    _hot_views: Set[str]
+
+    _manifest_path: str | os.PathLike | None = None
+
+    _profiler: StartupProfiler | None = None
+    _profile_path: str | os.PathLike | None = None
+    _startup_report: StartupReport | None = None
+
+    _metrics: RequestMetrics | None = None
+    _enable_metrics: bool = False
+
     def __init__(
             self, 
             app: Flask, 
             *,
             app_conf: Dict[str, Any] | None = None,
             url_prefix: str | None = None,
+            warm_up: bool = False,
+            warm_up_workers: int | None = None,
+            shutdown_timeout: float | None = None,
+            lazy_views: bool = False,
+            hot_views: Sequence[str] | None = None,
+            manifest: str | os.PathLike | None = None,
+            profile: bool = False,
+            profile_memory: bool = True,
+            profile_path: str | os.PathLike | None = None,
+            metrics: bool = False
         ) -> None:
         # Save app
         self._app = app
@@ -60,28 +153,132 @@ class Bootstrap:
         self._op.init_app(app)
         # Context classes
         self._ctx_types = []
+        self._request_ctx_plan = _ContextPlan([])
         # Save global url prefix
         if url_prefix is not None:
             self._url_prefix = url_prefix
+        self._warm_up = warm_up
+        self._warm_up_workers = warm_up_workers
+        self._shutdown_timeout = shutdown_timeout
+        self._lazy_views = lazy_views
+        self._hot_views = set(hot_views or ())
+        self._manifest_path = manifest
+        if profile or profile_path is not None:
+            self._profiler = StartupProfiler(trace_memory=profile_memory)
+            self._profile_path = profile_path
+        self._enable_metrics = metrics
+
+    @property
+    def startup_report(self) -> StartupReport | None:
+        """
+        Startup profiling report, None when profiling is disabled.
+        """
+        return self._startup_report
+
+    @property
+    def warm_up_timings(self) -> Dict[str, float] | None:
+        """
+        Building time in seconds of each object built by warm-up, None when 
+        warm-up is disabled.
+        """
+        return self._warm_up_timings
+
+    def _record(self, kind: str, name: str) -> ContextManager:
+        if self._profiler is None:
+            return nullcontext()
+        return self._profiler.record(kind, name)
+
+    def _load_module(self, mdl_name: str) -> ModuleType:
+        if self._profiler is None or mdl_name in sys.modules:
+            return load_module(mdl_name)
+        with self._profiler.record('import', mdl_name):
+            return load_module(mdl_name)
 
     def _register_view(self, url_prefix: str, view_obj: BaseView):
+        if self._metrics is not None and isinstance(view_obj, _HandlerView):
+            view_obj.attach_metrics(self._metrics)
+        url_rule = self._add_url_rule(
+            url_prefix, view_obj.url_rule, view_obj.endpoint, view_obj, 
+            view_obj.methods
+        )
+        _logger.info('Mount view %r => [%s]', view_obj, url_rule)
+
+    def _register_lazy_view(self, url_prefix: str, view_cls: Type[View]):
+        url_rule = self._add_url_rule(
+            url_prefix, view_cls.url_rule, view_cls.default_endpoint(), 
+            _LazyView(self._op, view_cls, self._metrics), view_cls.methods
+        )
+        _logger.info('Mount lazy view %s => [%s]', view_cls.__name__, url_rule)
+
+    def _add_url_rule(
+            self, 
+            url_prefix: str, 
+            url_rule: str, 
+            endpoint: str, 
+            view_func: Callable, 
+            methods: Tuple[str]
+        ) -> str:
         url_rule = join_url_paths([
-            url_prefix,  view_obj.url_rule
+            url_prefix,  url_rule
         ] if self._url_prefix is None else [
-            self._url_prefix, url_prefix, view_obj.url_rule
+            self._url_prefix, url_prefix, url_rule
         ])
         # Register to app
         self._app.add_url_rule(
             rule=url_rule,
-            endpoint=view_obj.endpoint,
-            view_func=view_obj,
-            methods=view_obj.methods
+            endpoint=endpoint,
+            view_func=view_func,
+            methods=methods
         )
-        _logger.info('Mount view %r => [%s]', view_obj, url_rule)
+        return url_rule
 
-    def _scan_app_package(self, pkg: ModuleType):
+    def _is_lazy_view(self, view: Type[BaseView] | BaseView) -> bool:
+        return (
+            self._lazy_views and inspect.isclass(view) and 
+            issubclass(view, View) and 
+            getattr(view, 'url_rule', None) is not None and 
+            view.default_endpoint() not in self._hot_views
+        )
+
+    def _collect_member(
+            self, 
+            url_path: str, 
+            member: Any, 
+            views: List[Tuple[str, Type[BaseView] | BaseView]], 
+            eh_types: List[Type[ErrorHandler]]
+        ) -> bool:
+        if inspect.isclass(member):
+            # Handle useful classes
+            if issubclass(member, BaseView):
+                views.append((url_path, member))
+            elif issubclass(member, BaseContext):
+                self._ctx_types.append(member)
+            elif issubclass(member, ErrorHandler):
+                eh_types.append(member)
+            else:
+                return False
+            return True
+        elif isinstance(member, BaseView):
+            views.append((url_path, member))
+            return True
+        return False
+
+    def _scan_modules(
+            self, 
+            pkg: ModuleType, 
+            views: List[Tuple[str, Type[BaseView] | BaseView]], 
+            eh_types: List[Type[ErrorHandler]],
+            manifest: RouteManifest | None
+        ) -> List[ScanEntry]:
         _logger.debug('Scanning views under package: %s', pkg.__name__)
         url_resolver = ModuleUrlResolver()
+        entries: List[ScanEntry] = []
+        source_files: List[str] = []
+        # Root package module affects url paths of its children
+        pkg_file = getattr(pkg, '__file__', None)
+        if pkg_file is not None:
+            source_files.append(pkg_file)
+        package_dirs: List[str] = list(pkg.__path__)
         for mi in pkgutil.walk_packages(
             path=pkg.__path__,
             prefix=f'{pkg.__name__}.'
@@ -89,52 +286,124 @@ class Bootstrap:
             # Skip private module
             if is_private_module(mi.name): continue
             # Load module
-            mdl = load_module(mi.name)
+            mdl = self._load_module(mi.name)
+            mdl_file = getattr(mdl, '__file__', None)
+            if mdl_file is not None:
+                source_files.append(mdl_file)
+            if mi.ispkg:
+                package_dirs.extend(mdl.__path__)
             _logger.debug('Scanning views under module: %s', mi.name)
+            url_path = url_resolver.get_url_path(mdl)
             for name, member in inspect.getmembers(mdl):
                 # Skip private member
                 if name.startswith('_'): continue
                 # Skip function
                 if inspect.isfunction(member): continue
-                # Handle class
                 if inspect.isclass(member):
                     # Skip imported class
                     if member.__module__ != mi.name: continue
                     # Skip abstract class
                     if inspect.isabstract(member): continue
-                    # Handle useful classes
-                    if issubclass(member, BaseView):
-                        view_obj = self._op.get(member)
-                        self._register_view(url_resolver.get_url_path(mdl), view_obj)
-                    elif issubclass(member, BaseContext):
-                        self._ctx_types.append(member)
-                    elif issubclass(member, ErrorHandler):
-                        eh_obj = self._op.get(member)
-                        self._app.register_error_handler(
-                            eh_obj.error_class or Exception, eh_obj.handle
-                        )
-                elif isinstance(member, BaseView):
-                    self._register_view(url_resolver.get_url_path(mdl), member)
+                if self._collect_member(url_path, member, views, eh_types):
+                    entries.append(ScanEntry(
+                        module=mi.name, name=name, url_path=url_path
+                    ))
+        if manifest is not None:
+            manifest.save(entries, source_files, package_dirs)
+        return entries
+
+    def _scan_app_package(self, pkg: ModuleType):
+        entries = None
+        manifest = None
+        if self._manifest_path is not None:
+            manifest = RouteManifest(self._manifest_path, pkg.__name__)
+            entries = manifest.load()
+        views: List[Tuple[str, Type[BaseView] | BaseView]] = []
+        eh_types: List[Type[ErrorHandler]] = []
+        if entries is not None:
+            _logger.debug('Loading views from manifest: %s', self._manifest_path)
+            try:
+                for entry in entries:
+                    member = getattr(
+                        self._load_module(entry.module), entry.name
+                    )
+                    if not self._collect_member(
+                        entry.url_path, member, views, eh_types
+                    ):
+                        raise TypeError(f'Unexpected member: {entry}')
+            except (ImportError, AttributeError, TypeError):
+                _logger.info('Manifest is stale, rescan package', exc_info=True)
+                entries = None
+                self._ctx_types.clear()
+                views.clear()
+                eh_types.clear()
+        if entries is None:
+            entries = self._scan_modules(pkg, views, eh_types, manifest)
+        if self._warm_up:
+            with self._record('phase', 'warm_up'):
+                self._warm_up_timings = self._op.warm_up(
+                    [
+                        view for _, view in views 
+                        if inspect.isclass(view) and not self._is_lazy_view(view)
+                    ] + eh_types,
+                    max_workers=self._warm_up_workers
+                )
+        # Register views and error handlers
+        for url_path, view in views:
+            view_name = get_class_name(view) if inspect.isclass(view) else \
+                view.endpoint
+            with self._record('route', view_name):
+                if self._is_lazy_view(view):
+                    self._register_lazy_view(url_path, view)
+                    continue
+                view_obj = self._op.get(view) if inspect.isclass(view) else view
+                self._register_view(url_path, view_obj)
+        for eh_type in eh_types:
+            eh_obj = self._op.get(eh_type)
+            self._app.register_error_handler(
+                eh_obj.error_class or Exception, eh_obj.handle
+            )
 
     def __enter__(self) -> Flask:
         # Register event functions
         self._app.before_request(self._before_request)
+        # After-request functions run in reversed order, put it at first to 
+        # see the final response.
+        self._app.after_request_funcs.setdefault(None, []).insert(
+            0, self._after_request
+        )
         self._app.teardown_request(self._teardown_request)
-        # Scan app package
-        app_pkg = load_module(self._app.import_name)
-        with self._app.app_context():
-            # Scan classes
-            self._scan_app_package(app_pkg)
-            # Setup task executor
-            te = self._op.get(TaskExecutor)
-            for ctx_type in self._ctx_types:
-                if issubclass(ctx_type, (CommonContext, TaskContext)):
-                    te.add_context_type(ctx_type)
-        # Sort request context by order
-        if len(self._ctx_types) > 0:
-            self._ctx_types.sort(
-                key=lambda c:c.order, reverse=True
-            )
+        if self._profiler is not None:
+            self._profiler.start()
+            self._op.profiler = self._profiler
+        try:
+            if self._enable_metrics:
+                self._metrics = self._op.get(RequestMetrics)
+            # Scan app package
+            app_pkg = self._load_module(self._app.import_name)
+            with self._app.app_context():
+                # Scan classes
+                with self._record('phase', 'scan'):
+                    self._scan_app_package(app_pkg)
+                # Setup task executors
+                with self._record('phase', 'tasks'):
+                    lanes = self._op.get(TaskLanes)
+                    pte = self._op.get(ProcessTaskExecutor)
+                    for ctx_type in self._ctx_types:
+                        if issubclass(ctx_type, (CommonContext, TaskContext)):
+                            lanes.add_context_type(ctx_type)
+                            pte.add_context_type(ctx_type)
+            # Prepare request contexts
+            self._request_ctx_plan = _ContextPlan([
+                ctx_type for ctx_type in self._ctx_types
+                if issubclass(ctx_type, (CommonContext, RequestContext))
+            ])
+        finally:
+            if self._profiler is not None:
+                self._op.profiler = None
+                self._startup_report = self._profiler.stop()
+        if self._profile_path is not None:
+            self._startup_report.dump(self._profile_path)
         return self._app
 
     def __exit__(
@@ -145,25 +414,79 @@ class Bootstrap:
         ) -> None:
         # Remove event functions
         self._app.before_request_funcs.get(None).remove(self._before_request)
+        self._app.after_request_funcs.get(None).remove(self._after_request)
         self._app.teardown_request_funcs.get(None).remove(self._teardown_request)
         # TODO: Remove views which are registered in __enter__.
         # Close object pool
-        self._op.close()
+        self._op.close(timeout=self._shutdown_timeout)
 
     def _before_request(self) -> ResponseReturnValue:
-        if len(self._ctx_types) == 0: return
+        self._op.enter_scope(Scope.REQUEST)
+        if len(self._request_ctx_plan) == 0: return
         # Enter request contexts
-        ctx_mgr = _ContextManager()
-        for ctx_type in self._ctx_types:
-            if not issubclass(ctx_type, (CommonContext, RequestContext)): continue
-            ctx_mgr.add_context(self._op.create(ctx_type))
-        ctx_mgr.__enter__()
+        if self._metrics is None:
+            _ContextManager(self._request_ctx_plan, self._op.create).__enter__()
+            return
+        start_time = time.perf_counter()
+        _ContextManager(self._request_ctx_plan, self._op.create).__enter__()
+        if request.endpoint is not None:
+            self._metrics.observe(
+                request.endpoint, 'context_enter', time.perf_counter() - start_time
+            )
+
+    def _after_request(self, response: Response) -> Response:
+        deferred = _DeferredExit.find(request.environ)
+        if deferred is not None and deferred.response is not response:
+            # Streaming response is replaced, it will never be closed
+            _DeferredExit.uninstall(request.environ)
+        return response
 
     def _teardown_request(self, exc_value: BaseException | None) -> None:
+        deferred = _DeferredExit.find(request.environ)
+        if deferred is not None and deferred.scheduled:
+            # Teardown again at the end of stream, request will be finished 
+            # when response is closed.
+            return
+        if deferred is not None and exc_value is not None:
+            # Request failed after rendering, error response is sent instead
+            _DeferredExit.uninstall(request.environ)
+            deferred = None
         ctx_mgr = _ContextManager.current()
         if ctx_mgr is not None:
-            exc_type, tb = None, None
-            if exc_value is not None:
-                exc_type = type(exc_value)
-                tb = exc_type.__traceback__
-            ctx_mgr.__exit__(exc_type, exc_value, tb)
+            ctx_mgr.detach()
+        release_scope = self._op.detach_scope(Scope.REQUEST)
+        if deferred is not None:
+            # Response is streaming, finish request after stream ends
+            deferred.add(functools.partial(
+                self._finish_request, ctx_mgr, exc_value, release_scope, 
+                request.endpoint
+            ))
+        else:
+            self._finish_request(
+                ctx_mgr, exc_value, release_scope, request.endpoint
+            )
+
+    def _finish_request(
+            self, 
+            ctx_mgr: _ContextManager | None, 
+            exc_value: BaseException | None, 
+            release_scope: Callable[[], None],
+            endpoint: str | None
+        ) -> None:
+        try:
+            if ctx_mgr is not None:
+                exc_type, tb = None, None
+                if exc_value is not None:
+                    exc_type = type(exc_value)
+                    tb = exc_value.__traceback__
+                start_time = time.perf_counter()
+                ctx_mgr.exit_contexts(exc_type, exc_value, tb)
+                if self._metrics is not None and endpoint is not None:
+                    self._metrics.observe(
+                        endpoint, 'context_exit', time.perf_counter() - start_time
+                    )
+        finally:
+            if ctx_mgr is not None:
+                for ctx in ctx_mgr.contexts:
+                    self._op.release(ctx)
+            release_scope()
\ No newline at end of file
@@ -1,11 +1,19 @@
 __author__ = 'deadblue'
 
+import logging
 from abc import ABC
-from contextlib import AbstractContextManager
+from contextlib import AbstractAsyncContextManager, AbstractContextManager
 from contextvars import ContextVar, Token
-from typing import List, Type, TypeVar
+from typing import (
+    Any, Callable, Dict, List, Sequence, Tuple, Type, TypeVar
+)
 from types import TracebackType
 
+from ._utils import get_class_name
+
+
+_logger = logging.getLogger(__name__)
+
 
 class BaseContext(AbstractContextManager, ABC):
     """
@@ -13,7 +21,13 @@ class BaseContext(AbstractContextManager, ABC):
     be exited after request or task ends.
 
     Context will be instantiated for each enter-exit loop, the instance will be
-    released after loop.
+    released after loop. Context which derives `Recyclable` (or declares 
+    `__recyclable__ = True`) and implements `reset` method will be reset and 
+    reused in later loops.
+
+    Context which implements `__aenter__` and `__aexit__` is an async context,
+    it will be entered in the event loop only around async handler and task, 
+    after all sync contexts.
     """
 
     order: int = 0
@@ -21,7 +35,24 @@ class BaseContext(AbstractContextManager, ABC):
     Context order, bigger one will be entered earlier, and existed later.
     """
 
-    pass
+    lanes: Tuple[str, ...] | None = None
+    """
+    Names of task lanes where the context will be entered, None for all lanes.
+    """
+
+    lazy: bool = False
+    """
+    Lazy context will be instantiated and entered only when it is found by
+    `find_context` at the first time.
+    """
+
+    def __exit__(
+            self, 
+            exc_type: type[BaseException] | None, 
+            exc_value: BaseException | None, 
+            tb: TracebackType | None
+        ) -> None:
+        return None
 
 
 class CommonContext(BaseContext, ABC):
@@ -45,28 +76,104 @@ class TaskContext(BaseContext, ABC):
     pass
 
 
-class _ContextManager(AbstractContextManager):
+class AsyncContextError(Exception):
+
+    def __init__(self, ctx_type: Type[BaseContext]) -> None:
+        message = (
+            f'{get_class_name(ctx_type)} is an async context, it is entered '
+            'only around async handlers and tasks'
+        )
+        super().__init__(message)
+
+
+class _ContextPlan:
+    """
+    Context types sorted by order, and index for finding context by its type 
+    or base type.
+    """
+
+    ctx_types: Tuple[Type[BaseContext], ...]
+    # Indexes of contexts which are entered with manager
+    eager_indexes: Tuple[int, ...]
+    # Indexes of async contexts
+    async_indexes: Tuple[int, ...]
+    # Context type or base type to index
+    type_indexes: Dict[Type, int]
+
+    def __init__(self, ctx_types: Sequence[Type[BaseContext]]) -> None:
+        self.ctx_types = tuple(sorted(
+            ctx_types, key=lambda c: c.order, reverse=True
+        ))
+        eager_indexes, async_indexes = [], []
+        self.type_indexes = {}
+        for index, ctx_type in enumerate(self.ctx_types):
+            if issubclass(ctx_type, AbstractAsyncContextManager):
+                async_indexes.append(index)
+            elif not ctx_type.lazy:
+                eager_indexes.append(index)
+            for cls in ctx_type.__mro__:
+                if cls is BaseContext or not issubclass(cls, BaseContext): continue
+                self.type_indexes.setdefault(cls, index)
+        self.eager_indexes = tuple(eager_indexes)
+        self.async_indexes = tuple(async_indexes)
+
+    def __len__(self) -> int:
+        return len(self.ctx_types)
 
-    _ctxs: List[BaseContext]
+
+class _ContextManager(AbstractContextManager, AbstractAsyncContextManager):
+
+    _plan: _ContextPlan
+    _factory: Callable[[Type[BaseContext]], BaseContext]
+    _ctxs: List[BaseContext | None]
+    # Entered sync contexts, in entering order
+    _entered: List[BaseContext]
+    _async_entered: bool = False
     _token: Token | None = None
 
-    def __init__(self) -> None:
-        self._ctxs = []
-    
-    def add_context(self, ctx: BaseContext):
-        self._ctxs.append(ctx)
+    def __init__(
+            self, 
+            plan: _ContextPlan, 
+            factory: Callable[[Type[BaseContext]], BaseContext]
+        ) -> None:
+        self._plan = plan
+        self._factory = factory
+        self._ctxs = [None] * len(plan)
+        self._entered = []
+
+    @property
+    def contexts(self) -> List[BaseContext]:
+        """
+        Instantiated contexts.
+        """
+        return [ctx for ctx in self._ctxs if ctx is not None]
 
     def find_context(self, cls: Type[BaseContext]) -> BaseContext:
-        for ctx in self._ctxs:
-            if type(ctx) is cls:
-                return ctx
-        return None
+        index = self._plan.type_indexes.get(cls, None)
+        if index is None:
+            return None
+        ctx = self._ctxs[index]
+        if ctx is not None and not self._async_entered and \
+            index in self._plan.async_indexes:
+            # Never return an async context which is not entered
+            raise AsyncContextError(self._plan.ctx_types[index])
+        if ctx is None:
+            # Activate lazy context
+            ctx = self._ctxs[index] = self._factory(self._plan.ctx_types[index])
+            self._entered.append(ctx)
+            ctx.__enter__()
+        return ctx
 
     def __enter__(self):
         # Put manager to ContextVar
         self._token = _cv_manager.set(self)
-        # Enter request contexts
-        for ctx in self._ctxs:
+        # Instantiate async contexts, they are entered in event loop
+        for index in self._plan.async_indexes:
+            self._ctxs[index] = self._factory(self._plan.ctx_types[index])
+        # Enter sync contexts
+        for index in self._plan.eager_indexes:
+            ctx = self._ctxs[index] = self._factory(self._plan.ctx_types[index])
+            self._entered.append(ctx)
             ctx.__enter__()
 
     def __exit__(
@@ -75,11 +182,41 @@ class _ContextManager(AbstractContextManager):
             exc_value: BaseException | None, 
             tb: TracebackType | None
         ) -> None:
-        # Exit request contexts in reversed order
-        for ctx in reversed(self._ctxs):
+        self.exit_contexts(exc_type, exc_value, tb)
+        self.detach()
+
+    def exit_contexts(
+            self, 
+            exc_type: type[BaseException] | None, 
+            exc_value: BaseException | None, 
+            tb: TracebackType | None
+        ) -> None:
+        # Exit sync contexts in reversed order
+        for ctx in reversed(self._entered):
             ctx.__exit__(exc_type, exc_value, tb)
-        # Reset ContextVar
-        _cv_manager.reset(self._token)
+
+    def detach(self) -> None:
+        # Reset ContextVar, entered contexts are kept
+        if self._token is not None:
+            _cv_manager.reset(self._token)
+            self._token = None
+
+    async def __aenter__(self):
+        # Enter async contexts
+        for index in self._plan.async_indexes:
+            await self._ctxs[index].__aenter__()
+        self._async_entered = True
+
+    async def __aexit__(
+            self, 
+            exc_type: type[BaseException] | None, 
+            exc_value: BaseException | None, 
+            tb: TracebackType | None
+        ) -> None:
+        self._async_entered = False
+        # Exit async contexts in reversed order
+        for index in reversed(self._plan.async_indexes):
+            await self._ctxs[index].__aexit__(exc_type, exc_value, tb)
 
     @classmethod
     def current(cls) -> '_ContextManager':
@@ -89,18 +226,70 @@ class _ContextManager(AbstractContextManager):
 _cv_manager = ContextVar[_ContextManager]('boostflask.context_manager')
 
 
+class _DeferredExit:
+    """
+    Callbacks to finish a request after its streaming response ends. 
+
+    Streaming renderer installs it into WSGI environ, then request teardown 
+    puts its work in it instead of doing immediately. It is uninstalled when 
+    the streaming response is not the one sent to client.
+    """
+
+    _ENVIRON_KEY = 'boostflask.deferred_exit'
+
+    _callbacks: List[Callable[[], None]]
+    scheduled: bool = False
+    # Streaming response which calls this when it is closed
+    response: Any = None
+
+    def __init__(self) -> None:
+        self._callbacks = []
+
+    def add(self, callback: Callable[[], None]):
+        self._callbacks.append(callback)
+        self.scheduled = True
+
+    def __call__(self) -> None:
+        callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            try:
+                callback()
+            except:
+                _logger.exception('Finish streaming request failed ...')
+
+    @classmethod
+    def install(cls, environ: Dict[str, Any]) -> '_DeferredExit':
+        deferred = environ.get(cls._ENVIRON_KEY, None)
+        if deferred is None:
+            deferred = environ[cls._ENVIRON_KEY] = _DeferredExit()
+        return deferred
+
+    @classmethod
+    def find(cls, environ: Dict[str, Any]) -> '_DeferredExit | None':
+        return environ.get(cls._ENVIRON_KEY, None)
+
+    @classmethod
+    def uninstall(cls, environ: Dict[str, Any]):
+        environ.pop(cls._ENVIRON_KEY, None)
+
+
 ContextType = TypeVar('ContextType', bound=BaseContext)
 
 
 def find_context(cls: Type[ContextType]) -> ContextType | None:
     """
-    Find custom request context that is bound to current request.
+    Find custom request context that is bound to current request, lazy 
+    context will be entered when it is found at the first time.
 
     Args:
         cls (Type[ContextType]): Request context type.
     
     Returns:
         ContextType: Context instance or None.
+
+    Raises:
+        AsyncContextError: When finding an async context outside async 
+            handler or task.
     """
     manager = _ContextManager.current()
     if manager is not None:
@@ -0,0 +1,232 @@
+__author__ = 'deadblue'
+
+import threading
+import weakref
+from bisect import bisect_left
+from dataclasses import dataclass
+from typing import Dict, List, Sequence, Tuple
+
+
+DEFAULT_BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+"""
+Default upper bounds in seconds of histogram buckets.
+"""
+
+
+@dataclass
+class HistogramSnapshot:
+    """
+    Merged values of a histogram.
+    """
+
+    buckets: Tuple[float, ...]
+    counts: List[int]
+    """
+    Count of each bucket, not cumulative, the last one is for +Inf.
+    """
+    sum: float
+    count: int
+
+
+class _ShardHolder:
+    """
+    Thread-local owner of a shard, it is released when its thread ends.
+    """
+
+    __slots__ = ('__weakref__', )
+
+
+def _retire_shard(ref: weakref.ref, shard: List[float]):
+    histogram: Histogram | None = ref()
+    if histogram is not None:
+        histogram._retire(shard)
+
+
+class Histogram:
+    """
+    Histogram with fixed buckets.
+
+    Each thread observes values into its own shard, so observing takes no
+    lock, shards are merged when taking snapshot. Shard of an ended thread is 
+    folded into retired totals, so shards do not grow with thread churn.
+
+    Args:
+        buckets (Sequence[float]): Upper bounds of buckets, in ascending order.
+    """
+
+    _buckets: Tuple[float, ...]
+    # Each shard holds counts of buckets, count of +Inf, and sum
+    _shards: List[List[float]]
+    # Merged shard of ended threads
+    _retired: List[float]
+    # Reentrant, since retiring may happen in GC while the lock is held
+    _shards_lock: threading.RLock
+    _local: threading.local
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS) -> None:
+        self._buckets = tuple(buckets)
+        self._shards = []
+        self._retired = self._make_shard()
+        self._shards_lock = threading.RLock()
+        self._local = threading.local()
+
+    def _make_shard(self) -> List[float]:
+        return [0] * (len(self._buckets) + 1) + [0.0]
+
+    def _new_shard(self) -> List[float]:
+        shard = self._local.shard = self._make_shard()
+        holder = self._local.holder = _ShardHolder()
+        with self._shards_lock:
+            self._shards.append(shard)
+        weakref.finalize(holder, _retire_shard, weakref.ref(self), shard)
+        return shard
+
+    def _retire(self, shard: List[float]):
+        with self._shards_lock:
+            self._shards = [s for s in self._shards if s is not shard]
+            for index, value in enumerate(shard):
+                self._retired[index] += value
+
+    def observe(self, value: float):
+        try:
+            shard = self._local.shard
+        except AttributeError:
+            shard = self._new_shard()
+        shard[bisect_left(self._buckets, value)] += 1
+        shard[-1] += value
+
+    def snapshot(self) -> HistogramSnapshot:
+        size = len(self._buckets) + 1
+        with self._shards_lock:
+            shards = list(self._shards)
+            retired = list(self._retired)
+        counts, total = retired[:size], retired[-1]
+        for shard in shards:
+            for index in range(size):
+                counts[index] += shard[index]
+            total += shard[-1]
+        return HistogramSnapshot(
+            buckets=self._buckets, counts=counts, sum=total, count=sum(counts)
+        )
+
+
+PHASES = ('resolve', 'context_enter', 'context_exit', 'handle', 'render')
+"""
+Names of request phases.
+"""
+
+
+class PhaseHistograms:
+    """
+    Histograms of request phases of an endpoint.
+    """
+
+    resolve: Histogram
+    context_enter: Histogram
+    context_exit: Histogram
+    handle: Histogram
+    render: Histogram
+
+    def __init__(self, buckets: Sequence[float]) -> None:
+        for phase in PHASES:
+            setattr(self, phase, Histogram(buckets))
+
+
+def _escape_label(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_bound(bound: float) -> str:
+    return repr(float(bound))
+
+
+class RequestMetrics:
+    """
+    Per-endpoint histograms of request phases: argument resolving, context
+    entering/exiting, handling and rendering.
+
+    Bootstrap records into it when `metrics` is enabled, a view derives from
+    `MetricsView` exposes it in Prometheus text format.
+
+    Recording a request costs several `perf_counter` calls and histogram
+    observations, a few microseconds per request on CPython 3.11.
+
+    Args:
+        buckets (Sequence[float]): Upper bounds in seconds of buckets.
+    """
+
+    _buckets: Tuple[float, ...]
+    _endpoints: Dict[str, PhaseHistograms]
+    _lock: threading.Lock
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS) -> None:
+        self._buckets = tuple(buckets)
+        self._endpoints = {}
+        self._lock = threading.Lock()
+
+    def endpoint(self, name: str) -> PhaseHistograms:
+        """
+        Get histograms of an endpoint, create them when missing.
+
+        Args:
+            name (str): Endpoint name.
+
+        Returns:
+            PhaseHistograms: Histograms of phases.
+        """
+        histograms = self._endpoints.get(name, None)
+        if histograms is None:
+            with self._lock:
+                histograms = self._endpoints.get(name, None)
+                if histograms is None:
+                    histograms = PhaseHistograms(self._buckets)
+                    self._endpoints[name] = histograms
+        return histograms
+
+    def observe(self, endpoint: str, phase: str, seconds: float):
+        getattr(self.endpoint(endpoint), phase).observe(seconds)
+
+    def snapshot(self) -> Dict[str, Dict[str, HistogramSnapshot]]:
+        """
+        Take snapshot of all histograms.
+
+        Returns:
+            Dict[str, Dict[str, HistogramSnapshot]]: Endpoint to phase to
+                histogram snapshot.
+        """
+        with self._lock:
+            endpoints = list(self._endpoints.items())
+        return {
+            name: {
+                phase: getattr(histograms, phase).snapshot() for phase in PHASES
+            } for name, histograms in endpoints
+        }
+
+    def render_prometheus(self) -> str:
+        """
+        Render histograms in Prometheus text exposition format.
+        """
+        name = 'boostflask_request_phase_seconds'
+        lines = [
+            f'# HELP {name} Time spent in each phase of request.',
+            f'# TYPE {name} histogram',
+        ]
+        for endpoint, phases in sorted(self.snapshot().items()):
+            endpoint = _escape_label(endpoint)
+            for phase, snapshot in phases.items():
+                if snapshot.count == 0: continue
+                labels = f'endpoint="{endpoint}",phase="{phase}"'
+                cumulative = 0
+                for bound, count in zip(snapshot.buckets, snapshot.counts):
+                    cumulative += count
+                    lines.append(
+                        f'{name}_bucket{{{labels},le="{_format_bound(bound)}"}} {cumulative}'
+                    )
+                lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {snapshot.count}')
+                lines.append(f'{name}_sum{{{labels}}} {snapshot.sum!r}')
+                lines.append(f'{name}_count{{{labels}}} {snapshot.count}')
+        lines.append('')
+        return '\n'.join(lines)
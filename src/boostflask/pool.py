@@ -1,15 +1,26 @@
 __author__ = 'deadblue'
 
+import functools
 import inspect
 import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import (
+    FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+)
+from contextvars import ContextVar, Token, copy_context
+from dataclasses import dataclass, field
+from enum import StrEnum
 from typing import (
-    Any, Dict, Protocol, Sequence, Type, TypeVar, 
-    runtime_checkable
+    Any, Callable, Deque, Dict, List, Protocol, Sequence, Set, Tuple, Type, 
+    TypeVar, runtime_checkable
 )
 
 from flask import Flask, current_app
 
 from ._config import ConfigManager
+from .profiling import StartupProfiler
 from ._typing import is_instance
 from ._utils import get_class_name
 
@@ -32,23 +43,234 @@ class CircularReferenceError(Exception):
         super().__init__(*args)
 
 
+class ScopeError(Exception):
+
+    def __init__(self, obj_type: Type, scope: str) -> None:
+        message = f'{get_class_name(obj_type)} requires an active {scope} scope'
+        super().__init__(message)
+
+
+class ScopeMismatchError(Exception):
+
+    def __init__(self, obj_type: Type, dep_type: Type, scope: str) -> None:
+        message = (
+            f'Singleton {get_class_name(obj_type)} can not depend on '
+            f'{scope}-scoped {get_class_name(dep_type)}'
+        )
+        super().__init__(message)
+
+
+class RecycleError(Exception):
+
+    def __init__(self, obj_type: Type, dep_type: Type, scope: str) -> None:
+        message = (
+            f'Recyclable {get_class_name(obj_type)} can not depend on '
+            f'{scope}-scoped {get_class_name(dep_type)}, it would be kept '
+            'after recycling'
+        )
+        super().__init__(message)
+
+
 @runtime_checkable
 class Closeable(Protocol):
 
     def close(self) -> None: pass
 
 
+class Recyclable:
+    """
+    Base class of objects which are reset and reused, instead of being 
+    reallocated, when they are created per request or task.
+
+    Recycling is opt-in: derive this class, or declare magic attribute 
+    `__recyclable__ = True` on a class which has a `reset` method.
+
+    Dependencies are injected only when the object is built, so recyclable 
+    class can only depend on singletons.
+    """
+
+    __recyclable__ = True
+
+    def reset(self) -> None: pass
+
+
+class Scope(StrEnum):
+    """
+    Lifetime of objects in ObjectPool.
+
+    Declare scope of a class through magic attribute `__scope__`, class 
+    without it is a singleton.
+    """
+
+    SINGLETON = 'singleton'
+    """
+    One instance in pool, it will be closed when pool closes.
+    """
+
+    REQUEST = 'request'
+    """
+    One instance per request, it will be released when request ends.
+    """
+
+    TASK = 'task'
+    """
+    One instance per task, it will be released when task ends.
+    """
+
+    TRANSIENT = 'transient'
+    """
+    New instance for each lookup.
+    """
+
+
+_MAGIC_SCOPE = '__scope__'
+_MAGIC_RECYCLABLE = '__recyclable__'
+
+
+@dataclass
+class CloseResult:
+    """
+    Result of closing ObjectPool.
+    """
+
+    closed: List[str] = field(default_factory=list)
+    """
+    Names of objects which are closed.
+    """
+
+    failed: List[str] = field(default_factory=list)
+    """
+    Names of objects which raised error when closing.
+    """
+
+    timed_out: List[str] = field(default_factory=list)
+    """
+    Names of objects which are not closed before deadline.
+    """
+
+    skipped: List[str] = field(default_factory=list)
+    """
+    Names of objects which have no close method, and are given up because 
+    objects depending on them are not closed before deadline.
+    """
+
+
 _EXTENSION_NAME = 'flask_objectpool'
 
 
+class _ConstructionPlan:
+    """
+    Compiled instantiation steps for a class.
+
+    Config values and the pool itself are resolved at compile time, only 
+    dependencies are looked up when instantiating.
+    """
+
+    obj_cls: Type
+    cls_name: str
+
+    recyclable: bool
+
+    _args: Tuple[Any, ...]
+    _kwargs: Dict[str, Any]
+    # Dependency slots: (position or keyword name, dependency class)
+    _deps: Tuple[Tuple[int | str, Type], ...]
+
+    def __init__(
+            self, 
+            obj_cls: Type, 
+            args: List[Any], 
+            kwargs: Dict[str, Any],
+            deps: List[Tuple[int | str, Type]]
+        ) -> None:
+        self.obj_cls = obj_cls
+        self.cls_name = get_class_name(obj_cls)
+        self.recyclable = (
+            getattr(obj_cls, _MAGIC_RECYCLABLE, False) is True and 
+            callable(getattr(obj_cls, 'reset', None))
+        )
+        self._args = tuple(args)
+        self._kwargs = kwargs
+        self._deps = tuple(deps)
+
+    @property
+    def dependencies(self) -> Tuple[Type, ...]:
+        return tuple(dep_cls for _, dep_cls in self._deps)
+
+    def instantiate(
+            self, 
+            pool: 'ObjectPool', 
+            dep_path: Sequence[str] | None
+        ) -> Any:
+        if len(self._deps) == 0:
+            return self.obj_cls(*self._args, **self._kwargs)
+        next_dep_path = (self.cls_name, )
+        if dep_path is not None:
+            next_dep_path = dep_path + next_dep_path
+        args, kwargs = list(self._args), self._kwargs.copy()
+        for slot, dep_cls in self._deps:
+            arg_value = pool._resolve(dep_cls, next_dep_path)
+            if isinstance(slot, int):
+                args[slot] = arg_value
+            else:
+                kwargs[slot] = arg_value
+        return self.obj_cls(*args, **kwargs)
+
+
+def _noop():
+    pass
+
+
+class _ScopedObjects:
+
+    objs: Dict[Type, Any]
+    token: Token | None = None
+
+    def __init__(self) -> None:
+        self.objs = {}
+
+
 class ObjectPool:
 
     _cm: ConfigManager
     _registry: Dict[str, Any]
+    _plans: Dict[Type, _ConstructionPlan]
+    # Per-class instantiation locks
+    _locks: Dict[str, threading.RLock]
+    _locks_guard: threading.Lock
+    # Classes whose dependency graphs are checked
+    _checked: Set[Type]
+    # Singleton dependencies of each object in registry
+    _dependencies: Dict[str, Tuple[str, ...]]
+    # Objects of request/task scope
+    _scope_vars: Dict[str, ContextVar[_ScopedObjects]]
+    # Reset objects for reusing
+    _free_lists: Dict[Type, Deque[Any]]
+    _recycle_limit: int
+
+    profiler: StartupProfiler | None = None
+    """
+    Profiler that records building of objects, it is set during startup.
+    """
 
-    def __init__(self, config: Dict[str, Any] | None = None) -> None:
+    def __init__(
+            self, 
+            config: Dict[str, Any] | None = None,
+            recycle_limit: int = 64
+        ) -> None:
         self._cm = ConfigManager(data=config)
         self._registry = {}
+        self._plans = {}
+        self._locks = {}
+        self._locks_guard = threading.Lock()
+        self._checked = set()
+        self._dependencies = {}
+        self._scope_vars = {
+            scope: ContextVar(f'boostflask.scope.{scope}')
+            for scope in (Scope.REQUEST, Scope.TASK)
+        }
+        self._free_lists = {}
+        self._recycle_limit = recycle_limit
 
     def init_app(self, app: Flask):
         # Register pool as flask extension
@@ -64,30 +286,176 @@ class ObjectPool:
         for obj in objs:
             key = get_class_name(type(obj))
             self._registry[key] = obj
+        self._invalidate()
+
+    def configure(self, config: Dict[str, Any] | None):
+        """
+        Replace configuration of the pool.
+
+        Objects which are already in pool will not be affected, but the new 
+        configuration will be applied on later instantiations.
+
+        Args:
+            config (Dict[str, Any] | None): New configuration.
+        """
+        self._cm = ConfigManager(data=config)
+        self._invalidate()
+
+    @property
+    def config(self) -> Dict[str, Any] | None:
+        """
+        Configuration of the pool.
+        """
+        return self._cm.data
+
+    def _invalidate(self):
+        self._plans.clear()
+        self._checked.clear()
+        self._free_lists.clear()
 
     def get(self, obj_cls: Type[T]) -> T:
         """
-        Lookup instance of given class, instantiate one when not found.
+        Lookup instance of given class in its scope, instantiate one when not 
+        found.
 
         Args:
             obj_cls (Type[T]): Object class.
         
         Returns:
             T: Object instance.
+        
+        Raises:
+            ScopeError: When the scope of class is not active.
+            ScopeMismatchError: When a singleton depends on a request or task 
+                scoped object.
+            RecycleError: When a recyclable class depends on a non-singleton 
+                object.
         """
-        return self._lookup(obj_cls)
+        return self._resolve(obj_cls)
 
     def create(self, obj_cls: Type[T]) -> T:
         """
         Create instance of given class, without caching it.
 
+        Recyclable instance will be reused if there is one.
+
         Args:
             obj_cls (Type[T]): Object class.
 
         Returns:
             T: Object instance.
+
+        Raises:
+            RecycleError: When a recyclable class depends on a non-singleton 
+                object.
+        """
+        return self._new(obj_cls)
+
+    def release(self, obj: Any):
+        """
+        Release an instance created by `create`, the instance will be reset 
+        and kept for reusing when it is recyclable.
+
+        Args:
+            obj (Any): Object instance.
+        """
+        plan = self._plans.get(type(obj), None)
+        if plan is None or not plan.recyclable: return
+        free_list = self._free_lists.get(plan.obj_cls, None)
+        if free_list is None:
+            free_list = self._free_lists.setdefault(
+                plan.obj_cls, deque(maxlen=self._recycle_limit)
+            )
+        try:
+            obj.reset()
+            free_list.append(obj)
+        except:
+            _logger.warning('Reset object %s failed ...', plan.cls_name)
+
+    def enter_scope(self, scope: Scope):
+        """
+        Start a request or task scope in current context.
+
+        Args:
+            scope (Scope): Scope.REQUEST or Scope.TASK.
         """
-        return self._instantiate(obj_cls)
+        cv = self._scope_vars[scope]
+        scoped = _ScopedObjects()
+        scoped.token = cv.set(scoped)
+
+    def exit_scope(self, scope: Scope):
+        """
+        End the request or task scope in current context, and release all 
+        objects in the scope.
+
+        Args:
+            scope (Scope): Scope.REQUEST or Scope.TASK.
+        """
+        self.detach_scope(scope)()
+
+    def detach_scope(self, scope: Scope) -> Callable[[], None]:
+        """
+        End the request or task scope in current context, but keep objects in
+        the scope alive until the returned function is called.
+
+        Args:
+            scope (Scope): Scope.REQUEST or Scope.TASK.
+        
+        Returns:
+            Callable[[], None]: Function to release objects in the scope.
+        """
+        cv = self._scope_vars[scope]
+        scoped = cv.get(None)
+        if scoped is None: return _noop
+        cv.reset(scoped.token)
+        return functools.partial(self._release_scoped, scoped)
+
+    def _release_scoped(self, scoped: _ScopedObjects):
+        # Release objects in reversed order
+        for obj in reversed(scoped.objs.values()):
+            plan = self._plans.get(type(obj), None)
+            if plan is not None and plan.recyclable:
+                self.release(obj)
+            elif isinstance(obj, Closeable):
+                try:
+                    obj.close()
+                except:
+                    _logger.warning(
+                        'Close object %s failed ...', get_class_name(type(obj))
+                    )
+
+    def _resolve(
+            self, 
+            obj_cls: Type[T],
+            dep_path: Sequence[str] | None = None
+        ) -> T:
+        scope = getattr(obj_cls, _MAGIC_SCOPE, Scope.SINGLETON)
+        if scope == Scope.SINGLETON:
+            return self._lookup(obj_cls, dep_path)
+        elif scope == Scope.TRANSIENT:
+            return self._new(obj_cls, dep_path)
+        cv = self._scope_vars.get(scope, None)
+        scoped = None if cv is None else cv.get(None)
+        if scoped is None:
+            raise ScopeError(obj_cls, scope)
+        obj = scoped.objs.get(obj_cls, None)
+        if obj is None:
+            obj = self._new(obj_cls, dep_path)
+            scoped.objs[obj_cls] = obj
+        return obj
+
+    def _new(
+            self, 
+            obj_cls: Type[T],
+            dep_path: Sequence[str] | None = None
+        ) -> T:
+        free_list = self._free_lists.get(obj_cls, None)
+        if free_list:
+            try:
+                return free_list.pop()
+            except IndexError:
+                pass
+        return self._instantiate(obj_cls, dep_path)
 
     def _lookup(
             self, 
@@ -95,30 +463,90 @@ class ObjectPool:
             dep_path: Sequence[str] | None = None
         ) -> T:
         cls_name = get_class_name(obj_cls)
+        # Fast-path: object is already instantiated
         obj = self._registry.get(cls_name, None)
-        if obj is None:
-            obj = self._instantiate(obj_cls, dep_path)
-            self._registry[cls_name] = obj
+        if obj is not None:
+            return obj
+        # Locks are taken along dependency edges, checking the graph before 
+        # locking makes sure that concurrent lookups never wait for each other 
+        # in a cycle.
+        if obj_cls not in self._checked:
+            self._check_graph(obj_cls)
+        # Only one thread instantiates the class, others wait for it
+        with self._get_lock(cls_name):
+            obj = self._registry.get(cls_name, None)
+            if obj is None:
+                obj = self._instantiate(obj_cls, dep_path)
+                self._dependencies[cls_name] = tuple(
+                    get_class_name(dep_cls) 
+                    for dep_cls in self._get_plan(obj_cls).dependencies
+                    if getattr(dep_cls, _MAGIC_SCOPE, Scope.SINGLETON) == Scope.SINGLETON
+                )
+                self._registry[cls_name] = obj
         return obj
 
+    def _check_graph(self, obj_cls: Type, visiting: List[str] | None = None):
+        # Check there is no cycle in dependency graph, and no singleton in it 
+        # captures a request/task scoped object.
+        if visiting is None:
+            visiting = []
+        cls_name = get_class_name(obj_cls)
+        if cls_name in visiting:
+            raise CircularReferenceError(' -> '.join(visiting + [cls_name]))
+        visiting.append(cls_name)
+        for dep_cls in self._get_plan(obj_cls).dependencies:
+            if dep_cls not in self._checked:
+                self._check_graph(dep_cls, visiting)
+        visiting.pop()
+        if getattr(obj_cls, _MAGIC_SCOPE, Scope.SINGLETON) == Scope.SINGLETON:
+            self._check_lifetime(obj_cls, obj_cls)
+        self._checked.add(obj_cls)
+
+    def _check_lifetime(self, singleton_cls: Type, obj_cls: Type):
+        for dep_cls in self._get_plan(obj_cls).dependencies:
+            scope = getattr(dep_cls, _MAGIC_SCOPE, Scope.SINGLETON)
+            if scope in (Scope.REQUEST, Scope.TASK):
+                raise ScopeMismatchError(singleton_cls, dep_cls, scope)
+            elif scope == Scope.TRANSIENT:
+                # Transient object is kept by the singleton too
+                self._check_lifetime(singleton_cls, dep_cls)
+
+    def _get_lock(self, cls_name: str) -> threading.RLock:
+        lock = self._locks.get(cls_name, None)
+        if lock is None:
+            with self._locks_guard:
+                lock = self._locks.setdefault(cls_name, threading.RLock())
+        return lock
+
     def _instantiate(
             self, 
             obj_cls: Type[T], 
             dep_path: Sequence[str] | None = None
         ) -> T:
+        plan = self._get_plan(obj_cls)
         if _logger.isEnabledFor(logging.DEBUG):
-            _logger.debug('Instantiating object: %s', get_class_name(obj_cls))
-
-        cls_name = get_class_name(obj_cls)
-        if dep_path is not None and cls_name in dep_path:
+            _logger.debug('Instantiating object: %s', plan.cls_name)
+        if dep_path is not None and plan.cls_name in dep_path:
             raise CircularReferenceError()
-
-        next_dep_path = (cls_name, )
-        if dep_path is not None:
-            next_dep_path = dep_path + next_dep_path
-
+        profiler = self.profiler
+        if profiler is None:
+            return plan.instantiate(self, dep_path)
+        # Dependencies are recorded as nested steps
+        with profiler.record('build', plan.cls_name):
+            return plan.instantiate(self, dep_path)
+
+    def _get_plan(self, obj_cls: Type) -> _ConstructionPlan:
+        plan = self._plans.get(obj_cls, None)
+        if plan is None:
+            plan = self._compile_plan(obj_cls)
+            self._plans[obj_cls] = plan
+        return plan
+
+    def _compile_plan(self, obj_cls: Type) -> _ConstructionPlan:
         # Prepare arguments for init method
-        args, kwargs = [], {}
+        args, kwargs, deps = [], {}, []
+        # Positional arguments after a skipped one are passed by keyword
+        by_keyword = False
         obj_conf = self._cm.get_object_config(obj_cls)
         # Parse init method
         init_sign = inspect.signature(obj_cls.__init__)
@@ -133,32 +561,264 @@ class ObjectPool:
                 (spec.annotation is not spec.empty) and \
                 (not is_instance(arg_value, spec.annotation)):
                 arg_value = None
+            dep_cls = None
             if arg_value is None:
                 # Skip argument with default value
-                if spec.default is not spec.empty: continue
+                if spec.default is not spec.empty:
+                    by_keyword = True
+                    continue
                 # Prepare argument value
                 if spec.annotation is spec.empty:
                     raise TypelessArgumentError(obj_cls, arg_name)
                 elif issubclass(spec.annotation, ObjectPool):
                     arg_value = self
                 else:
-                    arg_value = self._lookup(spec.annotation, next_dep_path)
-            # Put arg_value
-            if spec.kind in (spec.POSITIONAL_ONLY, spec.POSITIONAL_OR_KEYWORD):
+                    dep_cls = spec.annotation
+            # Put arg_value, dependency will be filled when instantiating
+            if spec.kind == spec.POSITIONAL_ONLY or (
+                spec.kind == spec.POSITIONAL_OR_KEYWORD and not by_keyword
+            ):
+                slot = len(args)
                 args.append(arg_value)
             else:
+                slot = arg_name
                 kwargs[arg_name] = arg_value
-        return obj_cls(*args, **kwargs)
+            if dep_cls is not None:
+                deps.append((slot, dep_cls))
+        plan = _ConstructionPlan(obj_cls, args, kwargs, deps)
+        if plan.recyclable:
+            # Reused object must not keep dependencies of earlier lifetime
+            for dep_cls in plan.dependencies:
+                scope = getattr(dep_cls, _MAGIC_SCOPE, Scope.SINGLETON)
+                if scope != Scope.SINGLETON:
+                    raise RecycleError(obj_cls, dep_cls, scope)
+        return plan
+
+    def warm_up(
+            self, 
+            obj_classes: Sequence[Type],
+            max_workers: int | None = None
+        ) -> Dict[str, float]:
+        """
+        Instantiate singletons of given classes and all their dependencies.
 
-    def close(self):
-        for name, obj in self._registry.items():
-            if isinstance(obj, Closeable):
-                try:
-                    obj.close()
-                except:
-                    _logger.warning('Close object %s failed ...', name)
-        # Remove all objects
-        self._registry.clear()
+        Dependencies are instantiated before their dependents, independent 
+        objects are instantiated in parallel. Building threads run in copies 
+        of the caller's context, e.g.: the Flask app context.
+
+        Args:
+            obj_classes (Sequence[Type]): Object classes.
+            max_workers (int | None): Maximum number of building threads.
+
+        Returns:
+            Dict[str, float]: Building time in seconds of each object.
+
+        Raises:
+            CircularReferenceError: When there is circular reference in the 
+                dependency graph, it is raised before building any object.
+        """
+        # Dependency graph of unbuilt singletons
+        graph: Dict[Type, Tuple[Type, ...]] = {}
+        visiting: List[str] = []
+        def visit(obj_cls: Type):
+            if obj_cls in graph: return
+            cls_name = get_class_name(obj_cls)
+            if cls_name in visiting:
+                raise CircularReferenceError(' -> '.join(visiting + [cls_name]))
+            visiting.append(cls_name)
+            # A class may take several arguments of the same dependency
+            deps = tuple(dict.fromkeys(
+                dep_cls for dep_cls in self._get_plan(obj_cls).dependencies
+                if self._is_unbuilt_singleton(dep_cls)
+            ))
+            for dep_cls in deps:
+                visit(dep_cls)
+            visiting.pop()
+            graph[obj_cls] = deps
+        for obj_cls in obj_classes:
+            if self._is_unbuilt_singleton(obj_cls):
+                visit(obj_cls)
+        if len(graph) == 0:
+            return {}
+
+        # Build objects in topological order
+        pending = {obj_cls: len(deps) for obj_cls, deps in graph.items()}
+        dependents: Dict[Type, List[Type]] = {obj_cls: [] for obj_cls in graph}
+        for obj_cls, deps in graph.items():
+            for dep_cls in deps:
+                dependents[dep_cls].append(obj_cls)
+        timings: Dict[str, float] = {}
+        def build(obj_cls: Type):
+            start_time = time.perf_counter()
+            self._lookup(obj_cls)
+            timings[get_class_name(obj_cls)] = time.perf_counter() - start_time
+
+        start_time = time.perf_counter()
+        with ThreadPoolExecutor(
+            max_workers=max_workers, 
+            thread_name_prefix='boostflask-warmup'
+        ) as executor:
+            running: Dict[Future, Type] = {}
+            def submit_ready(obj_classes: Sequence[Type]):
+                for obj_cls in obj_classes:
+                    if pending[obj_cls] == 0:
+                        # Build in a copy of current context, so that objects 
+                        # can access app context as they do in lazy path.
+                        fut = executor.submit(
+                            copy_context().run, build, obj_cls
+                        )
+                        running[fut] = obj_cls
+            submit_ready(list(graph.keys()))
+            while len(running) > 0:
+                done, _ = wait(running.keys(), return_when=FIRST_COMPLETED)
+                for fut in done:
+                    obj_cls = running.pop(fut)
+                    if fut.exception() is not None:
+                        for other in running.keys():
+                            other.cancel()
+                        raise fut.exception()
+                    for dependent in dependents[obj_cls]:
+                        pending[dependent] -= 1
+                    submit_ready(dependents[obj_cls])
+        _logger.info(
+            'Warmed up %d objects in %.3f seconds', 
+            len(timings), time.perf_counter() - start_time
+        )
+        for cls_name, cost in timings.items():
+            _logger.info('Built object %s in %.3f seconds', cls_name, cost)
+        return timings
+
+    def _is_unbuilt_singleton(self, obj_cls: Type) -> bool:
+        if getattr(obj_cls, _MAGIC_SCOPE, Scope.SINGLETON) != Scope.SINGLETON:
+            return False
+        return get_class_name(obj_cls) not in self._registry
+
+    def close(
+            self, 
+            timeout: float | None = None,
+            object_timeout: float | None = None,
+            max_workers: int | None = None
+        ) -> CloseResult:
+        """
+        Close all objects in pool and remove them.
+
+        An object is closed after all objects depending on it are closed, 
+        independent objects are closed in parallel. Objects are closed in 
+        daemon threads, so an object which hangs in closing will not block 
+        the process from exiting after deadline.
+
+        Args:
+            timeout (float | None): Deadline in seconds for closing all objects.
+            object_timeout (float | None): Deadline in seconds for closing each 
+                object.
+            max_workers (int | None): Maximum number of closing threads, None 
+                for no limit.
+
+        Returns:
+            CloseResult: Names of closed, failed, timed-out and skipped objects.
+        """
+        result = CloseResult()
+        registry, self._registry = self._registry, {}
+        dependencies, self._dependencies = self._dependencies, {}
+        self._invalidate()
+        # Count dependents of each object
+        dependents = {name: 0 for name in registry.keys()}
+        for name in registry.keys():
+            for dep_name in dependencies.get(name, ()):
+                if dep_name in dependents:
+                    dependents[dep_name] += 1
+        if len(registry) == 0:
+            return result
+
+        start_times: Dict[str, float] = {}
+        running: Dict[Future, str] = {}
+        # Objects waiting for a free closing thread
+        queued: Deque[str] = deque()
+        def start(name: str):
+            fut = Future()
+            fut.set_running_or_notify_cancel()
+            start_times[name] = time.monotonic()
+            threading.Thread(
+                target=_close_object, 
+                args=(registry[name], fut),
+                name=f'boostflask-closer-{name}',
+                daemon=True
+            ).start()
+            running[fut] = name
+        def start_queued():
+            while len(queued) > 0 and (
+                max_workers is None or len(running) < max_workers
+            ):
+                start(queued.popleft())
+        def finish(name: str):
+            for dep_name in dependencies.get(name, ()):
+                if dep_name not in dependents: continue
+                dependents[dep_name] -= 1
+                if dependents[dep_name] == 0:
+                    submit(dep_name)
+        def submit(name: str):
+            if isinstance(registry[name], Closeable):
+                queued.append(name)
+                start_queued()
+            else:
+                finish(name)
+        for name, count in list(dependents.items()):
+            if count == 0: submit(name)
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while len(running) > 0:
+            # Calculate waiting time before next deadline
+            now, wait_time = time.monotonic(), None
+            if deadline is not None:
+                wait_time = max(deadline - now, 0)
+            if object_timeout is not None:
+                for name in running.values():
+                    remain = max(start_times[name] + object_timeout - now, 0)
+                    wait_time = remain if wait_time is None else min(wait_time, remain)
+            done, _ = wait(
+                running.keys(), timeout=wait_time, return_when=FIRST_COMPLETED
+            )
+            for fut in done:
+                name = running.pop(fut)
+                if fut.exception() is None:
+                    result.closed.append(name)
+                else:
+                    _logger.warning(
+                        'Close object %s failed ...', name, exc_info=fut.exception()
+                    )
+                    result.failed.append(name)
+                finish(name)
+            now = time.monotonic()
+            if deadline is not None and now >= deadline:
+                break
+            if object_timeout is not None:
+                for fut, name in list(running.items()):
+                    if now >= start_times[name] + object_timeout:
+                        _logger.warning('Close object %s timed out ...', name)
+                        result.timed_out.append(name)
+                        running.pop(fut)
+                        finish(name)
+            start_queued()
+        # Give up objects which are not closed before deadline
+        for name in list(running.values()) + list(queued):
+            _logger.warning('Close object %s timed out ...', name)
+            result.timed_out.append(name)
+        for name, count in dependents.items():
+            if count == 0: continue
+            if isinstance(registry[name], Closeable):
+                result.timed_out.append(name)
+            else:
+                result.skipped.append(name)
+        return result
+
+
+def _close_object(obj: Closeable, fut: Future):
+    try:
+        obj.close()
+    except BaseException as e:
+        fut.set_exception(e)
+    else:
+        fut.set_result(None)
 
 
 def current_pool() -> ObjectPool | None:
@@ -0,0 +1,172 @@
+__author__ = 'deadblue'
+
+import json
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, Iterator, List
+
+
+@dataclass
+class StartupEvent:
+    """
+    A timed step of app startup.
+    """
+
+    kind: str
+    """
+    Step kind: "phase", "import", "build" or "route".
+    """
+
+    name: str
+    """
+    Phase name, module name, class name or endpoint.
+    """
+
+    start: float = 0.0
+    """
+    Start time in seconds, relative to the start of profiling.
+    """
+
+    wall_time: float = 0.0
+    """
+    Wall time in seconds, including nested steps.
+    """
+
+    alloc_bytes: int | None = None
+    """
+    Delta of traced memory in bytes, None when memory is not traced.
+
+    Memory is traced process-wide, the delta of steps which run in parallel
+    (e.g. warming up) includes allocations of each other.
+    """
+
+    parent: int | None = None
+    """
+    Index of the enclosing step in report events, e.g.: the object which
+    depends on the built object.
+    """
+
+    thread: str = ''
+
+
+@dataclass
+class StartupReport:
+    """
+    Startup profiling report.
+    """
+
+    total_time: float = 0.0
+    """
+    Wall time in seconds of the whole startup.
+    """
+
+    events: List[StartupEvent] = field(default_factory=list)
+    """
+    Steps in starting order.
+    """
+
+    def by_kind(self, kind: str) -> List[StartupEvent]:
+        return [event for event in self.events if event.kind == kind]
+
+    def slowest(self, kind: str | None = None, limit: int = 10) -> List[StartupEvent]:
+        """
+        Get slowest steps.
+
+        Args:
+            kind (str | None): Step kind, None for all kinds.
+            limit (int): Maximum count of returned steps.
+
+        Returns:
+            List[StartupEvent]: Steps sorted by wall time descending.
+        """
+        events = self.events if kind is None else self.by_kind(kind)
+        return sorted(events, key=lambda e: e.wall_time, reverse=True)[:limit]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    def dump(self, path: str | os.PathLike):
+        """
+        Write report to a JSON file.
+
+        Args:
+            path (str | PathLike): File path.
+        """
+        with open(path, 'w', encoding='utf-8') as fp:
+            json.dump(self.to_dict(), fp, indent=1)
+
+
+class StartupProfiler:
+    """
+    Record timings and memory deltas of startup steps.
+
+    Args:
+        trace_memory (bool): Trace memory allocations with tracemalloc, which
+            slows down startup.
+    """
+
+    _trace_memory: bool
+    _started_tracing: bool = False
+    _start_time: float = 0.0
+
+    _events: List[StartupEvent]
+    _lock: threading.Lock
+    # Stack of event indexes in each thread
+    _local: threading.local
+
+    def __init__(self, trace_memory: bool = True) -> None:
+        self._trace_memory = trace_memory
+        self._events = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def start(self):
+        if self._trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        self._start_time = time.perf_counter()
+
+    def stop(self) -> StartupReport:
+        total_time = time.perf_counter() - self._start_time
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+        return StartupReport(total_time=total_time, events=list(self._events))
+
+    @contextmanager
+    def record(self, kind: str, name: str) -> Iterator[StartupEvent]:
+        """
+        Record a step.
+
+        Args:
+            kind (str): Step kind.
+            name (str): Step name.
+        """
+        stack: List[int] = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        event = StartupEvent(
+            kind=kind, name=name,
+            parent=stack[-1] if len(stack) > 0 else None,
+            thread=threading.current_thread().name
+        )
+        with self._lock:
+            index = len(self._events)
+            self._events.append(event)
+        stack.append(index)
+        tracing = self._trace_memory and tracemalloc.is_tracing()
+        mem_start = tracemalloc.get_traced_memory()[0] if tracing else 0
+        start_time = time.perf_counter()
+        try:
+            yield event
+        finally:
+            end_time = time.perf_counter()
+            event.start = start_time - self._start_time
+            event.wall_time = end_time - start_time
+            if tracing:
+                event.alloc_bytes = tracemalloc.get_traced_memory()[0] - mem_start
+            stack.pop()
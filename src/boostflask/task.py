@@ -1,48 +1,373 @@
 __author__ = 'deadblue'
 
-from concurrent.futures import ThreadPoolExecutor, Future
-from typing import Any, Callable, List, ParamSpec, Type, TypeVar
+import asyncio
+import atexit
+import functools
+import heapq
+import itertools
+import threading
+import time
+import weakref
+from concurrent.futures import Future, ProcessPoolExecutor
+from multiprocessing.util import Finalize
+from dataclasses import dataclass, replace
+from enum import StrEnum
+from typing import (
+    Any, Callable, Dict, List, ParamSpec, Sequence, Tuple, Type, TypeVar
+)
 
-from .pool import ObjectPool, current_pool
-from .context import BaseContext, _ContextManager
+from .pool import ObjectPool, Scope, current_pool
+from .context import BaseContext, _ContextManager, _ContextPlan
+from ._utils import is_async_callable, load_module
 
 
 P = ParamSpec('P')
 T = TypeVar('T')
+R = TypeVar('R')
+
+
+class TaskRejectedError(Exception):
+
+    def __init__(self, *args: object) -> None:
+        super().__init__(*args)
+
+
+class OverflowPolicy(StrEnum):
+    """
+    What to do when submitting task to a full queue.
+    """
+
+    BLOCK = 'block'
+    """
+    Wait for free space, raise TaskRejectedError when timed out.
+    """
+
+    REJECT = 'reject'
+    """
+    Raise TaskRejectedError immediately.
+    """
+
+    CALLER_RUNS = 'caller_runs'
+    """
+    Run the task in the submitting thread.
+    """
+
+    DROP_OLDEST = 'drop_oldest'
+    """
+    Cancel the oldest queued task with the lowest priority to make room.
+    """
+
+
+@dataclass
+class TaskMetrics:
+    """
+    Counters of TaskExecutor.
+    """
+
+    queue_depth: int = 0
+    """
+    Number of queued tasks.
+    """
+
+    submitted: int = 0
+    rejected: int = 0
+    dropped: int = 0
+    completed: int = 0
+    failed: int = 0
+
+    queue_time_total: float = 0.0
+    """
+    Total seconds that tasks waited in queue.
+    """
+    queue_time_max: float = 0.0
+
+    exec_time_total: float = 0.0
+    """
+    Total seconds that tasks ran.
+    """
+    exec_time_max: float = 0.0
+
+
+DEFAULT_LANE = 'default'
+
+
+class _WorkItem:
+
+    future: Future
+    fn: Callable[..., Any]
+    args: Tuple[Any, ...]
+    kwargs: Dict[str, Any]
+    enqueue_time: float
+
+    def __init__(
+            self, 
+            fn: Callable[..., Any],
+            args: Tuple[Any, ...],
+            kwargs: Dict[str, Any]
+        ) -> None:
+        self.future = Future()
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.enqueue_time = time.monotonic()
 
 
 class TaskExecutor:
+    """
+    Run tasks on worker threads, within task contexts.
 
-    _ctx_types: List[Type[BaseContext]]
+    Queued tasks with higher priority run earlier, tasks with same priority 
+    run in submitting order.
+
+    Args:
+        pool (ObjectPool): Object pool.
+        name (str): Lane name of executor.
+        max_workers (int): Number of worker threads.
+        queue_size (int): Capacity of task queue, 0 means unlimited.
+        overflow_policy (str): Name of OverflowPolicy.
+        block_timeout (float | None): Waiting timeout in seconds for
+            OverflowPolicy.BLOCK, None means forever.
+    """
 
-    _executor: ThreadPoolExecutor
+    _ctx_types: List[Type[BaseContext]]
+    _ctx_plan: _ContextPlan | None = None
 
     _pool: ObjectPool
 
-    def __init__(self, pool: ObjectPool, max_workers: int = 8) -> None:
+    name: str
+
+    _max_workers: int
+    _workers: List[threading.Thread]
+    # Number of workers waiting for tasks
+    _idle: int = 0
+
+    # Heap of (negative priority, sequence, item)
+    _queue: List[Tuple[int, int, _WorkItem]]
+    _seq: itertools.count
+    _queue_size: int
+    _queue_cond: threading.Condition
+    _overflow_policy: OverflowPolicy
+    _block_timeout: float | None
+    _closed: bool = False
+
+    _metrics: TaskMetrics
+    _metrics_lock: threading.Lock
+
+    # Batchers which buffer items for this executor
+    _batchers: 'weakref.WeakSet[_Batcher]'
+
+    def __init__(
+            self, 
+            pool: ObjectPool,
+            name: str = DEFAULT_LANE,
+            max_workers: int = 8,
+            queue_size: int = 0,
+            overflow_policy: str = OverflowPolicy.BLOCK,
+            block_timeout: float | None = None
+        ) -> None:
         self._pool = pool
-        self._executor = ThreadPoolExecutor(
-            max_workers=max_workers,
-            thread_name_prefix='boostflask-worker'
-        )
+        self.name = name
+        self._max_workers = max_workers
+        self._workers = []
+        self._queue = []
+        self._seq = itertools.count()
+        self._queue_size = queue_size
+        self._queue_cond = threading.Condition()
+        self._overflow_policy = OverflowPolicy(overflow_policy)
+        self._block_timeout = block_timeout
+        self._metrics = TaskMetrics()
+        self._metrics_lock = threading.Lock()
+        self._batchers = weakref.WeakSet()
         self._ctx_types = []
 
     def add_context_type(self, ctx_type: Type[BaseContext]):
         self._ctx_types.append(ctx_type)
+        self._ctx_plan = None
+
+    def _add_batcher(self, batcher: '_Batcher'):
+        with self._queue_cond:
+            self._batchers.add(batcher)
 
     def submit(self, fn: Callable[P, T], *args, **kwargs) -> Future[T]:
-        return self._executor.submit(self._worker, fn, *args, **kwargs)
+        """
+        Submit a task with default priority 0.
+
+        Args:
+            fn (Callable[P, T]): Task function.
+
+        Returns:
+            Future[T]: Future of task result.
+
+        Raises:
+            TaskRejectedError: When task queue is full.
+        """
+        return self.submit_with_priority(0, fn, *args, **kwargs)
+
+    def submit_with_priority(
+            self, 
+            priority: int, 
+            fn: Callable[P, T], 
+            *args, **kwargs
+        ) -> Future[T]:
+        """
+        Submit a task with priority.
+
+        Args:
+            priority (int): Task priority, bigger one runs earlier.
+            fn (Callable[P, T]): Task function.
+
+        Returns:
+            Future[T]: Future of task result.
+
+        Raises:
+            TaskRejectedError: When task queue is full.
+        """
+        item, run_in_caller = _WorkItem(fn, args, kwargs), False
+        with self._queue_cond:
+            if self._closed:
+                raise RuntimeError('Cannot submit task after executor closed')
+            if self._is_full():
+                policy = self._overflow_policy
+                if policy == OverflowPolicy.CALLER_RUNS:
+                    run_in_caller = True
+                elif policy == OverflowPolicy.DROP_OLDEST:
+                    self._drop_oldest()
+                elif policy == OverflowPolicy.REJECT or not self._wait_for_space():
+                    self._count(rejected=1)
+                    raise TaskRejectedError('Task queue is full')
+            if not run_in_caller:
+                heapq.heappush(self._queue, (-priority, next(self._seq), item))
+                self._ensure_workers()
+                self._queue_cond.notify_all()
+        self._count(submitted=1)
+        if run_in_caller:
+            self._run(item)
+        return item.future
+
+    def _is_full(self) -> bool:
+        return self._queue_size > 0 and len(self._queue) >= self._queue_size
+
+    def _drop_oldest(self):
+        victim = max(self._queue, key=lambda entry: (entry[0], -entry[1]))
+        self._queue.remove(victim)
+        heapq.heapify(self._queue)
+        victim[2].future.cancel()
+        self._count(dropped=1)
+
+    def _wait_for_space(self) -> bool:
+        self._queue_cond.wait_for(
+            lambda: self._closed or not self._is_full(), 
+            self._block_timeout
+        )
+        return not (self._closed or self._is_full())
+
+    def _ensure_workers(self):
+        # Start a new worker only when idle workers can not take all tasks
+        if len(self._queue) <= self._idle: return
+        if len(self._workers) >= self._max_workers: return
+        if len(self._workers) == 0:
+            _live_executors.add(self)
+        worker = threading.Thread(
+            target=self._work_loop,
+            name=f'boostflask-{self.name}-worker_{len(self._workers)}',
+            daemon=True
+        )
+        worker.start()
+        self._workers.append(worker)
+
+    def _work_loop(self):
+        while True:
+            with self._queue_cond:
+                self._idle += 1
+                self._queue_cond.wait_for(
+                    lambda: self._closed or len(self._queue) > 0
+                )
+                self._idle -= 1
+                if len(self._queue) == 0:
+                    # Executor is closed and all tasks are done
+                    return
+                _, _, item = heapq.heappop(self._queue)
+                # Wake up blocked submitter
+                self._queue_cond.notify_all()
+            self._run(item)
+
+    def _run(self, item: _WorkItem):
+        if not item.future.set_running_or_notify_cancel(): return
+        start_time = time.monotonic()
+        queue_time = start_time - item.enqueue_time
+        try:
+            result = self._worker(item.fn, *item.args, **item.kwargs)
+        except BaseException as e:
+            item.future.set_exception(e)
+            failed = 1
+        else:
+            item.future.set_result(result)
+            failed = 0
+        exec_time = time.monotonic() - start_time
+        with self._metrics_lock:
+            m = self._metrics
+            m.completed += 1 - failed
+            m.failed += failed
+            m.queue_time_total += queue_time
+            m.queue_time_max = max(m.queue_time_max, queue_time)
+            m.exec_time_total += exec_time
+            m.exec_time_max = max(m.exec_time_max, exec_time)
+
+    def _count(self, submitted: int = 0, rejected: int = 0, dropped: int = 0):
+        with self._metrics_lock:
+            self._metrics.submitted += submitted
+            self._metrics.rejected += rejected
+            self._metrics.dropped += dropped
+
+    @property
+    def metrics(self) -> TaskMetrics:
+        """
+        Snapshot of executor counters.
+        """
+        with self._metrics_lock:
+            metrics = replace(self._metrics)
+        metrics.queue_depth = len(self._queue)
+        return metrics
 
     def _worker(self, fn: Callable[P, T], *args, **kwargs) -> T:
-        # Prepare contexts
-        ctx_mgr = _ContextManager()
-        for ctx_type in self._ctx_types:
-            ctx_mgr.add_context(self._pool.create(ctx_type))
-        with ctx_mgr:
-            return fn(*args, **kwargs)
+        plan = self._ctx_plan
+        if plan is None:
+            plan = self._ctx_plan = _ContextPlan(self._ctx_types)
+        self._pool.enter_scope(Scope.TASK)
+        ctx_mgr = _ContextManager(plan, self._pool.create)
+        try:
+            with ctx_mgr:
+                if is_async_callable(fn):
+                    return asyncio.run(self._async_worker(ctx_mgr, fn, args, kwargs))
+                return fn(*args, **kwargs)
+        finally:
+            for ctx in ctx_mgr.contexts:
+                self._pool.release(ctx)
+            self._pool.exit_scope(Scope.TASK)
+
+    async def _async_worker(
+            self, 
+            ctx_mgr: _ContextManager,
+            fn: Callable[P, T],
+            args: Tuple[Any, ...],
+            kwargs: Dict[str, Any]
+        ) -> T:
+        async with ctx_mgr:
+            return await fn(*args, **kwargs)
 
     def close(self):
-        self._executor.shutdown(wait=True)
+        # Submit items buffered by batchers
+        with self._queue_cond:
+            batchers = list(self._batchers)
+        for batcher in batchers:
+            batcher.flush(self)
+        # Stop accepting tasks, and wait for queued tasks done
+        with self._queue_cond:
+            self._closed = True
+            self._queue_cond.notify_all()
+        for worker in self._workers:
+            worker.join()
+        _live_executors.discard(self)
 
     @classmethod
     def current(cls) -> 'TaskExecutor':
@@ -52,10 +377,386 @@ class TaskExecutor:
         return None
 
 
-def as_task(fn: Callable[P, T]) -> Callable[P, Future[T]]:
-    def wrapper(*args: Any, **kwargs: Any) -> Future[T]:
-        te = TaskExecutor.current()
-        if te is None:
-            return None
-        return te.submit(fn, *args, **kwargs)
-    return wrapper
+# Executors which have started workers, and are not closed yet
+_live_executors: 'weakref.WeakSet[TaskExecutor]' = weakref.WeakSet()
+
+
+@atexit.register
+def _drain_executors():
+    # Workers are daemon threads, run queued tasks before interpreter exits, 
+    # when app exits without closing executors.
+    for te in list(_live_executors):
+        te.close()
+
+
+class TaskLanes:
+    """
+    Named task executors, each one has its own workers, context types and 
+    metrics.
+
+    Lanes are declared in config, for example:
+
+    ```
+    {'boostflask': {'task': {'task_lanes': {'lanes': {
+        'bulk': {'max_workers': 2, 'queue_size': 1000}
+    }}}}}
+    ```
+
+    The global TaskExecutor is the default lane.
+
+    Args:
+        pool (ObjectPool): Object pool.
+        lanes (Dict[str, Any] | None): Lane name to TaskExecutor arguments.
+    """
+
+    _lanes: Dict[str, TaskExecutor]
+
+    def __init__(
+            self, 
+            pool: ObjectPool, 
+            lanes: Dict[str, Any] | None = None
+        ) -> None:
+        self._lanes = {DEFAULT_LANE: pool.get(TaskExecutor)}
+        if lanes is not None:
+            for name, lane_conf in lanes.items():
+                if name == DEFAULT_LANE: continue
+                self._lanes[name] = TaskExecutor(pool, name=name, **lane_conf)
+
+    def get(self, name: str | None = None) -> TaskExecutor:
+        """
+        Get executor of lane.
+
+        Args:
+            name (str | None): Lane name, None for default lane.
+
+        Returns:
+            TaskExecutor: Executor of lane.
+        
+        Raises:
+            KeyError: When lane is not declared.
+        """
+        return self._lanes[name or DEFAULT_LANE]
+
+    def add_context_type(self, ctx_type: Type[BaseContext]):
+        for name, te in self._lanes.items():
+            if ctx_type.lanes is None or name in ctx_type.lanes:
+                te.add_context_type(ctx_type)
+
+    @property
+    def metrics(self) -> Dict[str, TaskMetrics]:
+        """
+        Metrics of each lane.
+        """
+        return {
+            name: te.metrics for name, te in self._lanes.items()
+        }
+
+    def close(self):
+        # Default lane is closed by pool
+        for name, te in self._lanes.items():
+            if name != DEFAULT_LANE: te.close()
+
+    @classmethod
+    def current(cls) -> 'TaskLanes':
+        pool = current_pool()
+        if pool is not None:
+            return pool.get(TaskLanes)
+        return None
+
+
+class ProcessTaskExecutor:
+    """
+    Run CPU-bound tasks in worker processes.
+
+    Each worker process has its own ObjectPool built from the same config, and 
+    runs tasks within task contexts like TaskExecutor. Task function must be 
+    a module-level function, its arguments and return value must be picklable.
+
+    Args:
+        pool (ObjectPool): Object pool.
+        max_workers (int): Number of worker processes.
+    """
+
+    _ctx_types: List[Type[BaseContext]]
+
+    _pool: ObjectPool
+
+    _max_workers: int
+    _executor: ProcessPoolExecutor | None = None
+    _lock: threading.Lock
+
+    def __init__(self, pool: ObjectPool, max_workers: int = 2) -> None:
+        self._pool = pool
+        self._max_workers = max_workers
+        self._lock = threading.Lock()
+        self._ctx_types = []
+
+    def add_context_type(self, ctx_type: Type[BaseContext]):
+        self._ctx_types.append(ctx_type)
+
+    def submit(self, fn: Callable[P, T], *args, **kwargs) -> Future[T]:
+        """
+        Submit a task to worker processes.
+
+        Args:
+            fn (Callable[P, T]): Module-level task function.
+
+        Returns:
+            Future[T]: Future of task result.
+        """
+        if '<locals>' in fn.__qualname__:
+            raise ValueError(f'Task function must be module-level: {fn.__qualname__}')
+        return self._get_executor().submit(
+            _process_worker, fn.__module__, fn.__qualname__, args, kwargs
+        )
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    executor = ProcessPoolExecutor(
+                        max_workers=self._max_workers,
+                        initializer=_init_process,
+                        initargs=(self._pool.config, tuple(self._ctx_types))
+                    )
+                    # Start all worker processes
+                    for _ in range(self._max_workers):
+                        executor.submit(int)
+                    self._executor = executor
+        return self._executor
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+
+    @classmethod
+    def current(cls) -> 'ProcessTaskExecutor':
+        pool = current_pool()
+        if pool is not None:
+            return pool.get(ProcessTaskExecutor)
+        return None
+
+
+# TaskExecutor in worker process
+_process_executor: TaskExecutor | None = None
+
+
+def _init_process(
+        config: Dict[str, Any] | None, 
+        ctx_types: Tuple[Type[BaseContext], ...]
+    ):
+    global _process_executor
+    pool = ObjectPool(config=config)
+    Finalize(pool, pool.close, exitpriority=10)
+    _process_executor = TaskExecutor(pool, max_workers=1)
+    for ctx_type in ctx_types:
+        _process_executor.add_context_type(ctx_type)
+
+
+def _process_worker(
+        mdl_name: str, 
+        qualname: str, 
+        args: Tuple[Any, ...], 
+        kwargs: Dict[str, Any]
+    ) -> Any:
+    fn = load_module(mdl_name)
+    for name in qualname.split('.'):
+        fn = getattr(fn, name)
+    # Unwrap function decorated by as_task
+    fn = getattr(fn, '__wrapped__', fn)
+    return _process_executor._worker(fn, *args, **kwargs)
+
+
+def as_task(
+        fn: Callable[P, T] | None = None, 
+        *, 
+        process: bool = False,
+        lane: str | None = None,
+        priority: int = 0
+    ):
+    """
+    Make a function run as background task when it is called, the decorated 
+    function returns a Future of task result.
+
+    Can be used as `@as_task` or `@as_task(lane='bulk', priority=...)`.
+
+    Args:
+        fn (Callable[P, T] | None): Task function.
+        process (bool): Run task in worker process, for CPU-bound function.
+        lane (str | None): Name of task lane, None for default lane.
+        priority (int): Task priority in lane, bigger one runs earlier.
+    """
+    def decorator(fn: Callable[P, T]) -> Callable[P, Future[T]]:
+        @functools.wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> Future[T]:
+            if process:
+                pte = ProcessTaskExecutor.current()
+                return None if pte is None else pte.submit(fn, *args, **kwargs)
+            lanes = TaskLanes.current()
+            if lanes is None:
+                return None
+            return lanes.get(lane).submit_with_priority(
+                priority, fn, *args, **kwargs
+            )
+        return wrapper
+    if fn is None:
+        return decorator
+    return decorator(fn)
+
+
+# Items, futures and executor of a batch
+_Batch = Tuple[List[Any], List[Future], TaskExecutor]
+
+
+class _Batcher:
+
+    _bulk_fn: Callable[[List[Any]], Sequence[Any] | None]
+    _max_size: int
+    _max_delay: float
+
+    _items: List[Any]
+    _futures: List[Future]
+    _executor: TaskExecutor | None = None
+    _deadline: float = 0.0
+    _cond: threading.Condition
+    _flusher: threading.Thread | None = None
+
+    def __init__(
+            self, 
+            bulk_fn: Callable[[List[Any]], Sequence[Any] | None],
+            max_size: int,
+            max_delay: float
+        ) -> None:
+        self._bulk_fn = bulk_fn
+        self._max_size = max_size
+        self._max_delay = max_delay
+        self._items, self._futures = [], []
+        self._cond = threading.Condition()
+
+    def add(self, te: TaskExecutor, item: Any) -> Future:
+        future = Future()
+        batches: List[_Batch] = []
+        with self._cond:
+            if self._executor is not None and self._executor is not te:
+                # Flush items for another executor
+                batches.append(self._take())
+            if len(self._items) == 0:
+                self._executor = te
+                self._deadline = time.monotonic() + self._max_delay
+                # Let executor flush the batch when closing
+                te._add_batcher(self)
+                self._ensure_flusher()
+                self._cond.notify_all()
+            self._items.append(item)
+            self._futures.append(future)
+            if len(self._items) >= self._max_size:
+                batches.append(self._take())
+        # Submit outside the lock, submitting may block or run the batch in 
+        # current thread, depending on overflow policy.
+        for batch in batches:
+            self._submit(batch)
+        return future
+
+    def flush(self, te: TaskExecutor):
+        """
+        Submit buffered items for the executor immediately.
+        """
+        with self._cond:
+            if self._executor is not te or len(self._items) == 0: return
+            batch = self._take()
+        self._submit(batch)
+
+    def _ensure_flusher(self):
+        if self._flusher is not None: return
+        self._flusher = threading.Thread(
+            target=self._flush_loop,
+            name=f'boostflask-batcher-{self._bulk_fn.__name__}',
+            daemon=True
+        )
+        self._flusher.start()
+
+    def _flush_loop(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: len(self._items) > 0)
+                remain = self._deadline - time.monotonic()
+                if remain > 0:
+                    self._cond.wait(remain)
+                if len(self._items) == 0 or time.monotonic() < self._deadline:
+                    continue
+                batch = self._take()
+            self._submit(batch)
+
+    def _take(self) -> _Batch:
+        batch = (self._items, self._futures, self._executor)
+        self._items, self._futures, self._executor = [], [], None
+        return batch
+
+    def _submit(self, batch: _Batch):
+        items, futures, te = batch
+        try:
+            bulk_future = te.submit(self._bulk_fn, items)
+        except BaseException as e:
+            for future in futures:
+                future.set_exception(e)
+            return
+        bulk_future.add_done_callback(
+            functools.partial(_resolve_batch, futures)
+        )
+
+
+def _resolve_batch(futures: List[Future], bulk_future: Future):
+    if bulk_future.cancelled():
+        for future in futures:
+            future.cancel()
+        return
+    exc = bulk_future.exception()
+    if exc is None:
+        results = bulk_future.result()
+        if results is None:
+            results = [None] * len(futures)
+        elif len(results) != len(futures):
+            exc = ValueError(
+                f'Bulk function returned {len(results)} results for {len(futures)} items'
+            )
+    for index, future in enumerate(futures):
+        if not future.set_running_or_notify_cancel(): continue
+        if exc is not None:
+            future.set_exception(exc)
+        else:
+            future.set_result(results[index])
+
+
+def as_batch_task(
+        max_size: int = 100,
+        max_delay: float = 0.01,
+        lane: str | None = None
+    ):
+    """
+    Make a bulk function run as background task on batched items. 
+    
+    The decorated function accepts one item and returns a Future of its own 
+    result. Items are buffered and passed to the bulk function as a list when
+    there are `max_size` items or `max_delay` seconds passed since the first 
+    one. The bulk function returns results in the same order of items, or None.
+
+    Task contexts are entered once per batch. Buffered items are submitted 
+    when the executor of lane closes.
+
+    Args:
+        max_size (int): Maximum number of items in a batch.
+        max_delay (float): Maximum seconds that an item waits in buffer.
+        lane (str | None): Name of task lane, None for default lane.
+    """
+    def decorator(
+            bulk_fn: Callable[[List[T]], Sequence[R] | None]
+        ) -> Callable[[T], Future[R]]:
+        batcher = _Batcher(bulk_fn, max_size, max_delay)
+        @functools.wraps(bulk_fn)
+        def wrapper(item: T) -> Future[R]:
+            lanes = TaskLanes.current()
+            if lanes is None:
+                return None
+            return batcher.add(lanes.get(lane), item)
+        return wrapper
+    return decorator
@@ -1,12 +1,23 @@
 __author__ = 'deadblue'
 
 from .base import View, JsonView, HtmlView
+from .cache import CacheBackend, MemoryCacheBackend, ResponseCache
+from .compress import Compression
+from .conditional import Validators
 from .decorator import as_view
+from .metrics import MetricsView
 
 __all__ = [
     'View',
     'JsonView',
     'HtmlView',
+    'MetricsView',
+
+    'CacheBackend',
+    'Compression',
+    'MemoryCacheBackend',
+    'ResponseCache',
+    'Validators',
 
     'as_view'
 ]
\ No newline at end of file
@@ -1,15 +1,23 @@
 __author__ = 'deadblue'
 
+import time
 from abc import ABC, abstractmethod
 from typing import (
-    Any, ClassVar, Tuple, Type
+    Any, Callable, ClassVar, Dict, Tuple, Type
 )
 
-from flask import Response
+from flask import Response, current_app, request
 
+from boostflask.context import _ContextManager
+from boostflask.metrics import PhaseHistograms, RequestMetrics
+from boostflask._utils import is_async_callable
+from .cache import ResponseCache, bind_defaults
+from .compress import Compression
+from .conditional import Validators, ValidatorType, call_validator
 from .renderer import (
     RendererType, 
-    default, json, html
+    default, json, html,
+    fast_json as fast_json_renderer
 )
 from .resolver import (
     Resolver, StandardResolver
@@ -38,14 +46,233 @@ class BaseView(ABC):
     Handled request methods.
     """
 
+    @classmethod
+    def default_endpoint(cls) -> str:
+        """
+        Endpoint name of view class, made from full class name.
+        """
+        return f'{cls.__module__}_{cls.__name__}'.replace('.', '/')
+
     @abstractmethod
     def __call__(self, *args: Any, **kwargs: Any) -> Any:
         pass
 
 
-class View(BaseView, ABC):
+_CACHEABLE_METHODS = ('GET', 'HEAD')
+
+
+class _HandlerView(BaseView, ABC):
+    """
+    View which resolves arguments, invokes handler and renders result.
+
+    Handler and renderer can be coroutine functions, the view runs them on 
+    the event loop of Flask app.
+    """
+
+    _handler: Callable[..., Any]
+    _resolver: Resolver
+    _renderer: RendererType
+
+    _cache: ResponseCache | None = None
+    # Handler defaults which are bound to arguments before making cache key
+    _cache_defaults: Dict[str, Any]
+    _validator: ValidatorType | None = None
+    _auto_etag: bool = False
+    _compress: Compression | None = None
+    _phases: PhaseHistograms | None = None
+
+    _is_async: bool = False
+    _is_async_handler: bool = False
+    _is_async_renderer: bool = False
+
+    def _init_handler(
+            self, 
+            handler: Callable[..., Any],
+            resolver: Resolver,
+            renderer: RendererType,
+            cache: ResponseCache | None = None,
+            validator: ValidatorType | None = None,
+            auto_etag: bool = False,
+            compress: Compression | None = None
+        ):
+        self._handler = handler
+        self._resolver = resolver
+        self._renderer = renderer
+        self._cache = cache
+        self._cache_defaults = {} if cache is None else bind_defaults(handler)
+        self._validator = validator
+        self._auto_etag = auto_etag
+        self._compress = compress
+        self._is_async_handler = is_async_callable(handler)
+        self._is_async_renderer = is_async_callable(renderer)
+        self._is_async = self._is_async_handler or self._is_async_renderer
+
+    def attach_metrics(self, metrics: RequestMetrics):
+        """
+        Record phase timings of the view into metrics.
+
+        Phases are: "resolve" for resolving arguments and checking validators 
+        and cache, "handle" for running handler (and entering async contexts), 
+        and "render" for rendering, compressing, etc.
+        """
+        self._phases = metrics.endpoint(self.endpoint)
+
+    def __call__(self, *args: Any, **kwargs: Any) -> Response:
+        if self._is_async:
+            return current_app.ensure_sync(self._async_call)(*args, **kwargs)
+        if self._phases is not None:
+            return self._timed_call(args, kwargs)
+        call_args = self._resolver.resolve_args(*args, **kwargs)
+        validators, cache_key, resp = self._before_handle(call_args)
+        if resp is None:
+            resp = self._renderer(self._handler(**call_args))
+            if cache_key is not None:
+                self._cache.put(cache_key, resp)
+        return self._after_render(resp, validators)
+
+    def _timed_call(
+            self, 
+            args: Tuple[Any, ...], 
+            kwargs: Dict[str, Any]
+        ) -> Response:
+        phases = self._phases
+        start_time = time.perf_counter()
+        call_args = self._resolver.resolve_args(*args, **kwargs)
+        validators, cache_key, resp = self._before_handle(call_args)
+        resolved_time = time.perf_counter()
+        phases.resolve.observe(resolved_time - start_time)
+        if resp is None:
+            result = self._handler(**call_args)
+            handled_time = time.perf_counter()
+            phases.handle.observe(handled_time - resolved_time)
+            resp = self._renderer(result)
+            if cache_key is not None:
+                self._cache.put(cache_key, resp)
+        else:
+            handled_time = resolved_time
+        resp = self._after_render(resp, validators)
+        phases.render.observe(time.perf_counter() - handled_time)
+        return resp
+
+    async def _async_call(self, *args: Any, **kwargs: Any) -> Response:
+        phases = self._phases
+        if phases is not None:
+            start_time = time.perf_counter()
+        call_args = await self._resolver.resolve_args_async(*args, **kwargs)
+        validators, cache_key, resp = self._before_handle(call_args)
+        if phases is not None:
+            handled_time = resolved_time = time.perf_counter()
+            phases.resolve.observe(resolved_time - start_time)
+        if resp is None:
+            ctx_mgr = _ContextManager.current()
+            if ctx_mgr is None:
+                result = await self._async_handle(call_args)
+            else:
+                # Enter async contexts in the event loop
+                async with ctx_mgr:
+                    result = await self._async_handle(call_args)
+            if phases is not None:
+                handled_time = time.perf_counter()
+                phases.handle.observe(handled_time - resolved_time)
+            if self._is_async_renderer:
+                resp = await self._renderer(result)
+            else:
+                resp = self._renderer(result)
+            if cache_key is not None:
+                self._cache.put(cache_key, resp)
+        resp = self._after_render(resp, validators)
+        if phases is not None:
+            phases.render.observe(time.perf_counter() - handled_time)
+        return resp
+
+    def _before_handle(
+            self, call_args: Dict[str, Any]
+        ) -> Tuple[Validators | None, str | None, Response | None]:
+        """
+        Check validators and cache before running handler.
+
+        Returns:
+            Tuple[Validators | None, str | None, Response | None]: Validators, 
+                cache key, and response when handler should be skipped.
+        """
+        if request.method not in _CACHEABLE_METHODS:
+            return None, None, None
+        validators = None
+        if self._validator is not None:
+            validators = call_validator(self._validator, call_args)
+            if validators is not None and not validators.is_modified(request):
+                return None, None, validators.not_modified()
+        if self._cache is None:
+            return validators, None, None
+        cache_key = self._cache.request_key(
+            self.endpoint, self._bind_cache_defaults(call_args)
+        )
+        if cache_key is None:
+            return validators, None, None
+        return validators, cache_key, self._cache.get(cache_key)
+
+    def _after_render(
+            self, 
+            resp: Response, 
+            validators: Validators | None
+        ) -> Response:
+        if validators is not None:
+            validators.apply(resp)
+        elif (
+            self._auto_etag and resp.status_code == 200 and 
+            not resp.is_streamed and 'ETag' not in resp.headers
+        ):
+            # Hash rendered body, client still receives 304 when it matches
+            resp.add_etag()
+            resp = resp.make_conditional(request)
+        if self._compress is not None:
+            resp = self._compress.apply(request, resp)
+        return resp
+
+    def invalidate_cache(self, **call_args: Any) -> None:
+        """
+        Remove cached response of the view for handler arguments.
+
+        Args:
+            call_args (Any): Handler arguments.
+        """
+        if self._cache is not None:
+            self._cache.invalidate(
+                self.endpoint, **self._bind_cache_defaults(call_args)
+            )
+
+    def _bind_cache_defaults(self, call_args: Dict[str, Any]) -> Dict[str, Any]:
+        if len(self._cache_defaults) == 0:
+            return call_args
+        return {**self._cache_defaults, **call_args}
+
+    async def _async_handle(self, call_args: Dict[str, Any]) -> Any:
+        if self._is_async_handler:
+            return await self._handler(**call_args)
+        return self._handler(**call_args)
+
+
+class View(_HandlerView, ABC):
     """
     Base view class for developer.
+
+    The `handle` method can be a coroutine function.
+
+    Routing rule can be declared as class attribute `url_rule` instead of 
+    passing to constructor, then Bootstrap can register the view without 
+    instantiating it in lazy mode.
+
+    Args:
+        url_rule (str | None): Routing rule, None to use class attribute.
+        renderer (RendererType): Response renderer.
+        cache (ResponseCache | None): Response cache for GET and HEAD requests.
+        validator (ValidatorType | None): Validator hook, which receives 
+            handler arguments and returns ETag or last modified time, 304 is 
+            responded without running handler when client's version matches.
+        auto_etag (bool): Add ETag hashed from rendered body, when there is 
+            no validator.
+        compress (Compression | None): Compression stage, which compresses 
+            response body when client accepts gzip or deflate.
     """
 
     resolver_class: ClassVar[Type[Resolver]] = StandardResolver
@@ -53,54 +280,101 @@ class View(BaseView, ABC):
     Resolver class
     """
 
-    _resolver: Resolver
-    _renderer: RendererType
-
     def __init__(
             self, 
-            url_rule: str,
+            url_rule: str | None = None,
             *,
-            renderer: RendererType = default
+            renderer: RendererType = default,
+            cache: ResponseCache | None = None,
+            validator: ValidatorType | None = None,
+            auto_etag: bool = False,
+            compress: Compression | None = None
         ) -> None:
-        self.url_rule = url_rule
-        self._renderer = renderer
+        if url_rule is not None:
+            self.url_rule = url_rule
+        elif getattr(self, 'url_rule', None) is None:
+            raise ValueError(f'{type(self).__name__} has no url_rule')
         # Instantiate argument resolver
-        self._resolver = self.resolver_class()
-        self._resolver.parse_handler(self.handle)
+        resolver = self.resolver_class()
+        resolver.parse_handler(self.handle)
+        self._init_handler(
+            self.handle, resolver, renderer, cache, validator, auto_etag, 
+            compress
+        )
 
-        # Use full class name as endpoint
-        cls = type(self)
-        self.endpoint = f'{cls.__module__}_{cls.__name__}'.replace('.', '/')
-
-    def __call__(self, *args: Any, **kwargs: Any) -> Response:
-        call_args = self._resolver.resolve_args(*args, **kwargs)
-        result = self.handle(**call_args)
-        return self._renderer(result)
+        self.endpoint = self.default_endpoint()
 
     @abstractmethod
     def handle(self, *args: Any, **kwargs: Any) -> Any: pass
 
 
 class JsonView(View, ABC):
+    """
+    View which renders result as JSON.
+
+    Args:
+        url_rule (str | None): Routing rule, None to use class attribute.
+        fast_json (bool): Use fast JSON renderer, which supports dataclasses, 
+            datetimes and objects with `__slots__`.
+        cache (ResponseCache | None): Response cache, see `View`.
+        validator (ValidatorType | None): Validator hook, see `View`.
+        auto_etag (bool): Add ETag hashed from rendered body.
+        compress (Compression | None): Compression stage, see `View`.
+    """
 
     def __init__(
             self, 
-            url_rule: str
+            url_rule: str | None = None,
+            *,
+            fast_json: bool = False,
+            cache: ResponseCache | None = None,
+            validator: ValidatorType | None = None,
+            auto_etag: bool = False,
+            compress: Compression | None = None
         ) -> None:
         super().__init__(
             url_rule=url_rule, 
-            renderer=json
+            renderer=fast_json_renderer if fast_json else json,
+            cache=cache,
+            validator=validator,
+            auto_etag=auto_etag,
+            compress=compress
         )
 
 
 class HtmlView(View, ABC):
+    """
+    View which renders result with a HTML template.
+
+    Args:
+        url_rule (str | None): Routing rule, None to use class attribute.
+        template_name (str): Template file name.
+        stream (bool): Stream rendered page, useful for large pages.
+        buffer_size (int): Minimum size in bytes of each streamed chunk.
+        cache (ResponseCache | None): Response cache for GET and HEAD requests,
+            streamed pages are not cached.
+        validator (ValidatorType | None): Validator hook, see `View`.
+        auto_etag (bool): Add ETag hashed from rendered body.
+        compress (Compression | None): Compression stage, see `View`.
+    """
     
     def __init__(
             self, 
-            url_rule: str, 
-            template_name: str
+            url_rule: str | None, 
+            template_name: str, 
+            *, 
+            stream: bool = False, 
+            buffer_size: int = 8192,
+            cache: ResponseCache | None = None,
+            validator: ValidatorType | None = None,
+            auto_etag: bool = False,
+            compress: Compression | None = None
         ) -> None:
         super().__init__(
             url_rule=url_rule, 
-            renderer=html(template_name)
+            renderer=html(template_name, stream=stream, buffer_size=buffer_size),
+            cache=cache,
+            validator=validator,
+            auto_etag=auto_etag,
+            compress=compress
         )
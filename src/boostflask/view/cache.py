@@ -0,0 +1,330 @@
+__author__ = 'deadblue'
+
+import inspect
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass
+from enum import Enum
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+from flask import Response, has_request_context, request
+
+
+@dataclass
+class CachedResponse:
+    """
+    Rendered response stored in cache.
+    """
+
+    status: int
+    headers: List[Tuple[str, str]]
+    body: bytes
+
+    def to_response(self) -> Response:
+        return Response(self.body, status=self.status, headers=self.headers)
+
+
+class CacheBackend(ABC):
+    """
+    Storage of cached responses.
+    """
+
+    @abstractmethod
+    def get(self, key: str) -> CachedResponse | None:
+        """
+        Get cached response.
+
+        Args:
+            key (str): Cache key.
+
+        Returns:
+            CachedResponse | None: Cached response, None when it is missing or
+                expired.
+        """
+        pass
+
+    @abstractmethod
+    def set(self, key: str, value: CachedResponse, ttl: float) -> None:
+        """
+        Put response into cache.
+
+        Args:
+            key (str): Cache key.
+            value (CachedResponse): Response to be cached.
+            ttl (float): Time to live in seconds.
+        """
+        pass
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        pass
+
+    @abstractmethod
+    def clear(self) -> None:
+        pass
+
+
+class MemoryCacheBackend(CacheBackend):
+    """
+    In-process cache backend, which evicts least recently used response when
+    it is full.
+
+    Args:
+        max_size (int): Maximum count of cached responses.
+    """
+
+    _max_size: int
+    # Key to (expire time, response)
+    _entries: 'OrderedDict[str, Tuple[float, CachedResponse]]'
+    _lock: threading.Lock
+
+    def __init__(self, max_size: int = 1024) -> None:
+        self._max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> CachedResponse | None:
+        with self._lock:
+            entry = self._entries.get(key, None)
+            if entry is None:
+                return None
+            expire_time, value = entry
+            if expire_time <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: CachedResponse, ttl: float) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_size:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+@dataclass
+class CacheStats:
+    """
+    Snapshot of cache counters.
+    """
+
+    hits: int = 0
+    misses: int = 0
+    """
+    Count of lookups which did not find a response, including expired ones.
+    """
+    stores: int = 0
+
+
+# Types of argument value that can be a part of cache key
+_KEY_TYPES = (str, int, float, bool, bytes, type(None), Enum)
+
+
+# Request headers which identify a user, requests with them are not cached 
+# unless cache varies on user.
+_PRIVATE_HEADERS = ('Authorization', 'Cookie')
+
+
+def _is_key_value(value: Any) -> bool:
+    if isinstance(value, _KEY_TYPES):
+        return True
+    if isinstance(value, (tuple, frozenset)):
+        return all(_is_key_value(item) for item in value)
+    return False
+
+
+def bind_defaults(handler: Callable[..., Any]) -> Dict[str, Any]:
+    """
+    Get default values of handler arguments which can be parts of cache key, 
+    so that a request omitting an argument shares the key with a request 
+    passing its default value.
+    """
+    return {
+        name: param.default 
+        for name, param in inspect.signature(handler).parameters.items()
+        if param.default is not param.empty and _is_key_value(param.default)
+    }
+
+
+class ResponseCache:
+    """
+    Response cache for views, which caches rendered responses of GET and HEAD
+    requests, keyed on endpoint and resolved handler arguments.
+
+    By default only anonymous responses are cacheable: requests carrying 
+    `Authorization` or `Cookie` header (including Flask session) bypass the 
+    cache, since the key does not tell users apart. To cache per-user or 
+    per-session responses, pass a `vary` function which returns the user 
+    identity from current request, it becomes a part of the key, for example:
+
+    ```
+    ResponseCache(ttl=30, vary=lambda: session.get('user_id'))
+    ```
+
+    Only 200 responses with a non-streamed body and no cookie are cached.
+    Requests whose arguments are not str, numbers, bytes, enums or tuples of
+    them (e.g. request bodies or uploaded files) are not cached.
+
+    Args:
+        ttl (float): Time to live in seconds of cached responses.
+        max_size (int): Maximum count of cached responses, for default backend.
+        backend (CacheBackend | None): Cache backend, default is an in-process
+            LRU backend.
+        vary (Callable[[], Any] | None): Function returns extra key part from 
+            current request, e.g. user id. Its result should be str, number 
+            or tuple of them, otherwise the request is not cached.
+        vary_headers (Sequence[str]): Request headers whose values are parts 
+            of the key, e.g. "Accept-Language".
+    """
+
+    _ttl: float
+    _backend: CacheBackend
+    _vary: Callable[[], Any] | None = None
+    _vary_headers: Tuple[str, ...]
+
+    _stats: CacheStats
+    _stats_lock: threading.Lock
+
+    def __init__(
+            self,
+            ttl: float = 60,
+            *,
+            max_size: int = 1024,
+            backend: CacheBackend | None = None,
+            vary: Callable[[], Any] | None = None,
+            vary_headers: Sequence[str] = ()
+        ) -> None:
+        self._ttl = ttl
+        self._backend = backend or MemoryCacheBackend(max_size)
+        self._vary = vary
+        self._vary_headers = tuple(vary_headers)
+        self._stats = CacheStats()
+        self._stats_lock = threading.Lock()
+
+    @property
+    def backend(self) -> CacheBackend:
+        return self._backend
+
+    @property
+    def stats(self) -> CacheStats:
+        """
+        Snapshot of hit/miss counters.
+        """
+        with self._stats_lock:
+            return CacheStats(
+                hits=self._stats.hits,
+                misses=self._stats.misses,
+                stores=self._stats.stores
+            )
+
+    @property
+    def hits(self) -> int:
+        with self._stats_lock:
+            return self._stats.hits
+
+    @property
+    def misses(self) -> int:
+        with self._stats_lock:
+            return self._stats.misses
+
+    def make_key(self, endpoint: str, call_args: Dict[str, Any]) -> str | None:
+        """
+        Make cache key from endpoint and handler arguments, and vary parts of 
+        current request if there is one.
+
+        Args:
+            endpoint (str): Endpoint name of view.
+            call_args (Dict[str, Any]): Resolved handler arguments.
+
+        Returns:
+            str | None: Cache key, or None when arguments can not be a part of
+                cache key.
+        """
+        items = sorted(call_args.items())
+        for _, value in items:
+            if not _is_key_value(value):
+                return None
+        key = f'{endpoint}:{items!r}'
+        if not has_request_context() or (
+            self._vary is None and len(self._vary_headers) == 0
+        ):
+            return key
+        headers = tuple(request.headers.get(name) for name in self._vary_headers)
+        vary_value = None if self._vary is None else self._vary()
+        if not _is_key_value(vary_value):
+            return None
+        return f'{key}|{headers!r}|{vary_value!r}'
+
+    def request_key(self, endpoint: str, call_args: Dict[str, Any]) -> str | None:
+        """
+        Make cache key for current request.
+
+        Returns:
+            str | None: Cache key, or None when the request should not be 
+                cached.
+        """
+        if self._vary is None and any(
+            name in request.headers for name in _PRIVATE_HEADERS
+        ):
+            return None
+        return self.make_key(endpoint, call_args)
+
+    def get(self, key: str) -> Response | None:
+        cached = self._backend.get(key)
+        with self._stats_lock:
+            if cached is None:
+                self._stats.misses += 1
+            else:
+                self._stats.hits += 1
+        return None if cached is None else cached.to_response()
+
+    def put(self, key: str, resp: Response) -> None:
+        if (
+            resp.status_code != 200 or
+            resp.is_streamed or
+            resp.direct_passthrough or
+            'Set-Cookie' in resp.headers
+        ): return
+        self._backend.set(key, CachedResponse(
+            status=resp.status_code,
+            headers=resp.headers.to_wsgi_list(),
+            body=resp.get_data()
+        ), self._ttl)
+        with self._stats_lock:
+            self._stats.stores += 1
+
+    def invalidate(self, endpoint: str, **call_args: Any) -> None:
+        """
+        Remove cached response for the endpoint and handler arguments. 
+        
+        When cache varies, only the variant of current request is removed, 
+        e.g. the response cached for current user, and nothing is removed 
+        outside request. Use `clear` to drop all variants.
+
+        Args:
+            endpoint (str): Endpoint name of view.
+            call_args (Any): Handler arguments.
+        """
+        key = self.make_key(endpoint, call_args)
+        if key is not None:
+            self._backend.delete(key)
+
+    def clear(self) -> None:
+        """
+        Remove all cached responses.
+        """
+        self._backend.clear()
@@ -0,0 +1,135 @@
+__author__ = 'deadblue'
+
+import hashlib
+import threading
+import zlib
+from collections import OrderedDict
+from typing import Iterable, Iterator, Tuple
+
+from flask import Request, Response
+
+
+# Encoding to wbits of zlib
+_WBITS = {
+    'gzip': 16 + zlib.MAX_WBITS,
+    'deflate': zlib.MAX_WBITS,
+}
+
+
+def _compress_stream(
+        chunks: Iterable[bytes], compressor: 'zlib._Compress'
+    ) -> Iterator[bytes]:
+    try:
+        for chunk in chunks:
+            data = compressor.compress(chunk)
+            # Flush every chunk, so client receives it without delay
+            data += compressor.flush(zlib.Z_SYNC_FLUSH)
+            yield data
+        yield compressor.flush(zlib.Z_FINISH)
+    finally:
+        close = getattr(chunks, 'close', None)
+        if close is not None:
+            close()
+
+
+class Compression:
+    """
+    Compression stage of view, which compresses response body in gzip or
+    deflate, negotiated from Accept-Encoding header.
+
+    Compressed bodies are remembered by their digests, so a cached or constant
+    response is compressed only once. Streamed responses are compressed chunk
+    by chunk.
+
+    Args:
+        level (int): Compression level, from 1 (fastest) to 9 (smallest).
+        min_size (int): Bodies smaller than it are not compressed, streamed
+            bodies are always compressed.
+        encodings (Tuple[str, ...]): Supported encodings in preference order.
+        memo_size (int): Maximum count of remembered compressed bodies, 0 to
+            disable.
+    """
+
+    _level: int
+    _min_size: int
+    _encodings: Tuple[str, ...]
+
+    _memo_size: int
+    # (encoding, digest of body) to compressed body
+    _memo: 'OrderedDict[Tuple[str, bytes], bytes]'
+    _memo_lock: threading.Lock
+
+    def __init__(
+            self,
+            level: int = 6,
+            *,
+            min_size: int = 1024,
+            encodings: Tuple[str, ...] = ('gzip', 'deflate'),
+            memo_size: int = 256
+        ) -> None:
+        for encoding in encodings:
+            if encoding not in _WBITS:
+                raise ValueError(f'Unsupported encoding: {encoding}')
+        self._level = level
+        self._min_size = min_size
+        self._encodings = encodings
+        self._memo_size = memo_size
+        self._memo = OrderedDict()
+        self._memo_lock = threading.Lock()
+
+    def _compress(self, encoding: str, body: bytes) -> bytes:
+        if self._memo_size == 0:
+            return self._compress_body(encoding, body)
+        key = (encoding, hashlib.blake2b(body, digest_size=16).digest())
+        with self._memo_lock:
+            data = self._memo.get(key, None)
+            if data is not None:
+                self._memo.move_to_end(key)
+                return data
+        data = self._compress_body(encoding, body)
+        with self._memo_lock:
+            self._memo[key] = data
+            while len(self._memo) > self._memo_size:
+                self._memo.popitem(last=False)
+        return data
+
+    def _compress_body(self, encoding: str, body: bytes) -> bytes:
+        compressor = zlib.compressobj(self._level, zlib.DEFLATED, _WBITS[encoding])
+        return compressor.compress(body) + compressor.flush()
+
+    def apply(self, req: Request, resp: Response) -> Response:
+        """
+        Compress response body when client accepts it.
+
+        Args:
+            req (Request): Current request.
+            resp (Response): Rendered response.
+
+        Returns:
+            Response: The response, whose body may be compressed.
+        """
+        if (
+            resp.status_code < 200 or resp.status_code in (204, 206, 304) or
+            resp.direct_passthrough or 'Content-Encoding' in resp.headers
+        ): return resp
+        resp.vary.add('Accept-Encoding')
+        encoding = req.accept_encodings.best_match(self._encodings)
+        if encoding is None:
+            return resp
+        if resp.is_streamed:
+            compressor = zlib.compressobj(
+                self._level, zlib.DEFLATED, _WBITS[encoding]
+            )
+            resp.response = _compress_stream(resp.response, compressor)
+            resp.headers.pop('Content-Length', None)
+        else:
+            body = resp.get_data()
+            if len(body) < self._min_size:
+                return resp
+            resp.set_data(self._compress(encoding, body))
+        resp.content_encoding = encoding
+        # Compressed content is not byte-identical to the origin one
+        etag, weak = resp.get_etag()
+        if etag is not None and not weak:
+            resp.set_etag(etag, weak=True)
+        return resp
@@ -0,0 +1,82 @@
+__author__ = 'deadblue'
+
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, Dict
+
+from flask import Request, Response
+from werkzeug.http import is_resource_modified
+
+
+@dataclass
+class Validators:
+    """
+    Validators of a resource, which are compared with conditional request
+    headers.
+    """
+
+    etag: str | None = None
+    """
+    Unquoted entity tag.
+    """
+
+    weak: bool = False
+    """
+    Whether the entity tag is weak.
+    """
+
+    last_modified: datetime | None = None
+    """
+    Last modified time of resource.
+    """
+
+    def is_modified(self, req: Request) -> bool:
+        """
+        Check resource is modified from the version client holds.
+
+        Args:
+            req (Request): Request with If-None-Match / If-Modified-Since.
+
+        Returns:
+            bool: False when client's version is still valid.
+        """
+        return is_resource_modified(
+            req.environ, etag=self.etag, last_modified=self.last_modified
+        )
+
+    def apply(self, resp: Response) -> None:
+        """
+        Set ETag and Last-Modified headers on response.
+        """
+        if self.etag is not None:
+            resp.set_etag(self.etag, weak=self.weak)
+        if self.last_modified is not None:
+            resp.last_modified = self.last_modified
+
+    def not_modified(self) -> Response:
+        """
+        Make a 304 response with validators.
+        """
+        resp = Response(status=304)
+        self.apply(resp)
+        return resp
+
+
+ValidatorType = Callable[..., Validators | str | datetime | None]
+"""
+Validator hook receives resolved handler arguments, and returns ETag, last
+modified time, Validators or None.
+"""
+
+
+def call_validator(
+        validator: ValidatorType, call_args: Dict[str, Any]
+    ) -> Validators | None:
+    result = validator(**call_args)
+    if result is None or isinstance(result, Validators):
+        return result
+    elif isinstance(result, str):
+        return Validators(etag=result)
+    elif isinstance(result, datetime):
+        return Validators(last_modified=result)
+    raise TypeError(f'Unsupported validator result: {type(result).__name__}')
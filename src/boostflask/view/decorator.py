@@ -4,7 +4,10 @@ from typing import (
     Any, Callable, ParamSpec, Type, TypeVar, Tuple
 )
 
-from .base import BaseView
+from .base import _HandlerView
+from .cache import ResponseCache
+from .compress import Compression
+from .conditional import ValidatorType
 from .renderer import (
     RendererType, 
     default as default_renderer
@@ -16,28 +19,24 @@ P = ParamSpec('P')
 R = TypeVar('R')
 
 
-class _FunctionView(BaseView):
-
-    _handler: Callable[..., Any]
-    _resolver: Resolver
-    _renderer: RendererType
+class _FunctionView(_HandlerView):
 
     def __init__(
             self, 
             url_rule: str,
             handler: Callable[..., Any],
             resolver: Resolver,
-            renderer: RendererType = default_renderer
+            renderer: RendererType = default_renderer,
+            cache: ResponseCache | None = None,
+            validator: ValidatorType | None = None,
+            auto_etag: bool = False,
+            compress: Compression | None = None
         ) -> None:
         self.url_rule = url_rule
-        self._handler = handler
-        self._resolver = resolver
-        self._renderer = renderer
-
-    def __call__(self, *args: Any, **kwargs: Any) -> Any:
-        call_args = self._resolver.resolve_args(*args, **kwargs)
-        result = self._handler(**call_args)
-        return self._renderer(result)
+        self._init_handler(
+            handler, resolver, renderer, cache, validator, auto_etag, 
+            compress
+        )
 
 
 def _make_endpoint_name(func: Callable) -> str:
@@ -50,22 +49,42 @@ def as_view(
         methods: Tuple[str] | None = None,
         resolver_class: Type[Resolver] = StandardResolver,
         renderer: RendererType = default_renderer, 
+        cache: ResponseCache | None = None,
+        validator: ValidatorType | None = None,
+        auto_etag: bool = False,
+        compress: Compression | None = None
     ):
     """
     Wrap a function to view object that boostflask can mount.
 
+    The function and renderer can be coroutine functions.
+
     Args:
         url_rule (str): The URL rule to route to this view.
         renderer (RendererType): Response renderer.
         methods (Tuple[str]): Handled HTTP methods.
         resolver_class (Type[Resolver]): Arguments resolver class.
+        cache (ResponseCache | None): Response cache for GET and HEAD requests.
+        validator (ValidatorType | None): Validator hook, which receives 
+            handler arguments and returns ETag or last modified time, 304 is 
+            responded without running handler when client's version matches.
+        auto_etag (bool): Add ETag hashed from rendered body, when there is 
+            no validator.
+        compress (Compression | None): Compression stage, which compresses 
+            response body when client accepts gzip or deflate.
     """
     def view_creator(func: Callable[P, R]) -> _FunctionView:
+        resolver = resolver_class()
+        resolver.parse_handler(func)
         fv = _FunctionView(
             url_rule=url_rule,
             handler=func,
-            resolver=resolver_class(func),
-            renderer=renderer
+            resolver=resolver,
+            renderer=renderer,
+            cache=cache,
+            validator=validator,
+            auto_etag=auto_etag,
+            compress=compress
         )
         fv.endpoint = _make_endpoint_name(func)
         if methods is not None and len(methods) > 0:
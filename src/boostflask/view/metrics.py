@@ -0,0 +1,39 @@
+__author__ = 'deadblue'
+
+from typing import Any, Tuple
+
+from flask import Response
+
+from boostflask.metrics import RequestMetrics
+from .base import BaseView
+
+
+_PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+class MetricsView(BaseView):
+    """
+    View which exposes request metrics in Prometheus text format.
+
+    Derive it in app package, and declare the routing rule:
+
+        class Metrics(MetricsView):
+            url_rule = '/metrics'
+
+    Request metrics are recorded only when Bootstrap enables `metrics`.
+    """
+
+    methods: Tuple[str] = ('GET', )
+
+    _metrics: RequestMetrics
+
+    def __init__(self, metrics: RequestMetrics) -> None:
+        self._metrics = metrics
+        self.endpoint = self.default_endpoint()
+
+    def __call__(self, *args: Any, **kwargs: Any) -> Response:
+        return Response(
+            self._metrics.render_prometheus(),
+            status=200,
+            content_type=_PROMETHEUS_CONTENT_TYPE
+        )
@@ -1,11 +1,25 @@
 __author__ = 'deadblue'
 
+import contextvars
+import dataclasses
+import datetime
 import json as jsonlib
-from typing import Any, Callable
+from enum import Enum
+from typing import Any, Callable, Dict, Iterable, Iterator, Tuple, Type
+from uuid import UUID
 
 from flask import (
-    Response, make_response, render_template
+    Response, current_app, make_response, render_template, request, 
+    stream_with_context
 )
+from flask.signals import before_render_template, template_rendered
+
+from ..context import _DeferredExit
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 
 RendererType = Callable[[Any], Response]
@@ -14,38 +28,312 @@ RendererType = Callable[[Any], Response]
 default = make_response
 
 
+_JSON_CONTENT_TYPE = 'application/json; charset=utf-8'
+
+
 def json(result: Any) -> Response:
     """
     JSON renderer
     """
-    resp_body = jsonlib.dumps(result)
-    resp = Response(resp_body, status=200)
-    resp.headers.update({
-        'Content-Type': 'application/json; charset=utf-8',
-        'Content-Length': len(resp_body)
-    })
+    resp_body = jsonlib.dumps(result).encode()
+    # Content-Length is set from bytes body
+    return Response(resp_body, status=200, content_type=_JSON_CONTENT_TYPE)
+
+
+# Slot names of classes
+_slots_cache: Dict[Type, Tuple[str, ...]] = {}
+
+
+def _get_slots(cls: Type) -> Tuple[str, ...]:
+    slots = _slots_cache.get(cls, None)
+    if slots is None:
+        names = []
+        for base in reversed(cls.__mro__):
+            base_slots = base.__dict__.get('__slots__', ())
+            if isinstance(base_slots, str):
+                base_slots = (base_slots, )
+            names.extend(
+                name for name in base_slots 
+                if name not in ('__dict__', '__weakref__')
+            )
+        slots = _slots_cache[cls] = tuple(names)
+    return slots
+
+
+def _to_json_value(obj: Any) -> Any:
+    if dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+        return {
+            field.name: getattr(obj, field.name) 
+            for field in dataclasses.fields(obj)
+        }
+    elif isinstance(obj, (datetime.date, datetime.time)):
+        return obj.isoformat()
+    elif isinstance(obj, UUID):
+        return str(obj)
+    elif isinstance(obj, Enum):
+        return obj.value
+    slots = _get_slots(type(obj))
+    if len(slots) > 0:
+        return {
+            name: getattr(obj, name) for name in slots if hasattr(obj, name)
+        }
+    raise TypeError(f'Object of type {type(obj).__name__} is not JSON serializable')
+
+
+class JsonRenderer:
+    """
+    JSON renderer which encodes result to bytes directly, with orjson when it 
+    is installed, or stdlib json.
+
+    Dataclasses, datetimes, UUIDs, enums and objects with `__slots__` are 
+    supported.
+
+    Args:
+        backend (str | None): "orjson" or "stdlib", None to choose automatically.
+    """
+
+    _dumps: Callable[[Any], bytes]
+    _encoder: jsonlib.JSONEncoder | None = None
+
+    def __init__(self, backend: str | None = None) -> None:
+        if backend is None:
+            backend = 'stdlib' if orjson is None else 'orjson'
+        if backend == 'orjson':
+            if orjson is None:
+                raise ImportError('orjson is not installed')
+            self._dumps = self._orjson_dumps
+        elif backend == 'stdlib':
+            self._encoder = jsonlib.JSONEncoder(
+                separators=(',', ':'), default=_to_json_value
+            )
+            self._dumps = self._stdlib_dumps
+        else:
+            raise ValueError(f'Unknown JSON backend: {backend}')
+
+    @staticmethod
+    def _orjson_dumps(result: Any) -> bytes:
+        # Accept non-str keys as stdlib json does
+        return orjson.dumps(
+            result, default=_to_json_value, option=orjson.OPT_NON_STR_KEYS
+        )
+
+    def _stdlib_dumps(self, result: Any) -> bytes:
+        return self._encoder.encode(result).encode()
+
+    def __call__(self, result: Any) -> Response:
+        return Response(
+            self._dumps(result), status=200, content_type=_JSON_CONTENT_TYPE
+        )
+
+
+fast_json = JsonRenderer()
+"""
+Fast JSON renderer.
+"""
+
+
+def _iter_in_context(
+        ctx: contextvars.Context, chunks: Iterator[bytes]
+    ) -> Iterator[bytes]:
+    try:
+        while True:
+            try:
+                chunk = ctx.run(next, chunks)
+            except StopIteration:
+                return
+            yield chunk
+    finally:
+        close = getattr(chunks, 'close', None)
+        if close is not None:
+            ctx.run(close)
+
+
+def streaming_response(chunks: Iterator[bytes], content_type: str) -> Response:
+    """
+    Make a streaming response from body chunks.
+
+    Chunks are generated in Flask request context and a copy of current 
+    context, so `flask.request`, `find_context` and request-scoped objects 
+    are available while streaming. Request contexts and request-scoped 
+    objects are kept until the response is closed.
+
+    Args:
+        chunks (Iterator[bytes]): Body chunks.
+        content_type (str): Content type of response.
+    
+    Returns:
+        Response: Streaming response without Content-Length.
+    """
+    deferred = _DeferredExit.install(request.environ)
+    body = _iter_in_context(
+        contextvars.copy_context(), stream_with_context(chunks)
+    )
+    resp = Response(body, status=200, content_type=content_type)
+    resp.call_on_close(deferred)
+    deferred.response = resp
     return resp
 
 
+_NDJSON_CONTENT_TYPE = 'application/x-ndjson; charset=utf-8'
+
+
+class StreamingJsonRenderer(JsonRenderer):
+    """
+    JSON renderer which accepts an iterable result, and streams its items as 
+    NDJSON or a JSON array.
+
+    Args:
+        array (bool): Stream items as a JSON array instead of NDJSON.
+        batch_size (int): Count of items to be encoded before flushing.
+        backend (str | None): "orjson" or "stdlib", None to choose automatically.
+    """
+
+    _array: bool
+    _batch_size: int
+
+    def __init__(
+            self, 
+            array: bool = False, 
+            batch_size: int = 16, 
+            backend: str | None = None
+        ) -> None:
+        super().__init__(backend)
+        if batch_size < 1:
+            raise ValueError('batch_size must be positive')
+        self._array = array
+        self._batch_size = batch_size
+
+    def _iter_ndjson(self, items: Iterator[Any]) -> Iterator[bytes]:
+        dumps, batch_size = self._dumps, self._batch_size
+        batch = []
+        for item in items:
+            batch.append(dumps(item))
+            if len(batch) >= batch_size:
+                batch.append(b'')
+                yield b'\n'.join(batch)
+                batch.clear()
+        if len(batch) > 0:
+            batch.append(b'')
+            yield b'\n'.join(batch)
+
+    def _iter_array(self, items: Iterator[Any]) -> Iterator[bytes]:
+        dumps, batch_size = self._dumps, self._batch_size
+        prefix, batch = b'[', []
+        for item in items:
+            batch.append(dumps(item))
+            if len(batch) >= batch_size:
+                yield prefix + b','.join(batch)
+                prefix = b','
+                batch.clear()
+        if len(batch) > 0:
+            yield prefix + b','.join(batch) + b']'
+        elif prefix == b'[':
+            yield b'[]'
+        else:
+            yield b']'
+
+    def __call__(self, result: Iterable[Any]) -> Response:
+        if self._array:
+            return streaming_response(
+                self._iter_array(iter(result)), _JSON_CONTENT_TYPE
+            )
+        return streaming_response(
+            self._iter_ndjson(iter(result)), _NDJSON_CONTENT_TYPE
+        )
+
+
+def stream_ndjson(batch_size: int = 16) -> StreamingJsonRenderer:
+    """
+    Helper function to create a renderer which streams result items as NDJSON.
+
+    Args:
+        batch_size (int): Count of items to be encoded before flushing.
+
+    Returns:
+        StreamingJsonRenderer: renderer instance.
+    """
+    return StreamingJsonRenderer(batch_size=batch_size)
+
+
+def stream_json_array(batch_size: int = 16) -> StreamingJsonRenderer:
+    """
+    Helper function to create a renderer which streams result items as a JSON 
+    array.
+
+    Args:
+        batch_size (int): Count of items to be encoded before flushing.
+
+    Returns:
+        StreamingJsonRenderer: renderer instance.
+    """
+    return StreamingJsonRenderer(array=True, batch_size=batch_size)
+
+
 class TemplateRenderer:
 
     _template_name: str
     _mime_type: str
+    _stream: bool
+    _buffer_size: int
 
-    def __init__(self, template_name: str, mime_type: str) -> None:
+    def __init__(
+            self, 
+            template_name: str, 
+            mime_type: str, 
+            *, 
+            stream: bool = False, 
+            buffer_size: int = 8192
+        ) -> None:
         """
         TemplateRenderer renders content with specified template.
 
+        In stream mode, the content is generated incrementally and sent once 
+        buffered content reaches `buffer_size`, the response has no 
+        Content-Length and is sent in chunked encoding. Since the status and 
+        headers have been sent, an error raised while rendering aborts the 
+        response instead of turning into an error page.
+
         Args:
             template_name (str): Template file name.
             mime_type (str): The MIME tpye of rendered content.
+            stream (bool): Stream rendered content.
+            buffer_size (int): Minimum size in bytes of each streamed chunk.
         """
 
         super().__init__()
         self._template_name = template_name
         self._mime_type = mime_type
+        self._stream = stream
+        self._buffer_size = buffer_size
+
+    def _generate(self, context: Dict[str, Any]) -> Iterator[bytes]:
+        app = current_app._get_current_object()
+        template = app.jinja_env.get_or_select_template(self._template_name)
+        app.update_template_context(context)
+        before_render_template.send(
+            app, _async_wrapper=app.ensure_sync, template=template, context=context
+        )
+        buffer_size = self._buffer_size
+        buffer, buffered = [], 0
+        for text in template.generate(context):
+            data = text.encode()
+            buffer.append(data)
+            buffered += len(data)
+            if buffered >= buffer_size:
+                yield b''.join(buffer)
+                buffer.clear()
+                buffered = 0
+        if buffered > 0:
+            yield b''.join(buffer)
+        template_rendered.send(
+            app, _async_wrapper=app.ensure_sync, template=template, context=context
+        )
 
     def __call__(self, result: Any) -> Response:
+        if self._stream:
+            return streaming_response(
+                self._generate(dict(result)), self._mime_type
+            )
         resp_body = render_template(self._template_name, **result).encode()
         resp = Response(resp_body, status=200)
         resp.headers.update({
@@ -55,28 +343,48 @@ class TemplateRenderer:
         return resp
 
 
-def from_template(template_name: str, mime_type: str) -> TemplateRenderer:
+def from_template(
+        template_name: str, 
+        mime_type: str, 
+        *, 
+        stream: bool = False, 
+        buffer_size: int = 8192
+    ) -> TemplateRenderer:
     """
     Helper function to create a TemplateRenderer with template name and MIME type.
 
     Args:
         template_name (str): Template file name.
         mime_type (str): The MIME tpye of rendered content.
+        stream (bool): Stream rendered content.
+        buffer_size (int): Minimum size in bytes of each streamed chunk.
     
     Returns:
         TemplateRenderer: renderer instance.
     """
-    return TemplateRenderer(template_name, mime_type)
+    return TemplateRenderer(
+        template_name, mime_type, stream=stream, buffer_size=buffer_size
+    )
 
 
-def html(template_name: str) -> TemplateRenderer:
+def html(
+        template_name: str, 
+        *, 
+        stream: bool = False, 
+        buffer_size: int = 8192
+    ) -> TemplateRenderer:
     """
     Helper function to create a HTML Renderer.
 
     Args:
         template_name (str): Template file name.
+        stream (bool): Stream rendered content.
+        buffer_size (int): Minimum size in bytes of each streamed chunk.
 
     Returns:
         TemplateRenderer: renderer instance.
     """
-    return from_template(template_name, 'text/html; charset=utf-8')
+    return from_template(
+        template_name, 'text/html; charset=utf-8', 
+        stream=stream, buffer_size=buffer_size
+    )
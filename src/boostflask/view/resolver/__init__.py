@@ -1,10 +1,20 @@
 __author__ = 'deadblue'
 
 from .base import Resolver
+from .converter import (
+    ConversionError, InvalidArgumentsError, register_converter
+)
 from .standard import StandardResolver
-from .types import RequestBody, JsonBody
+from .types import (
+    RequestBody, JsonBody, 
+    StreamBody, BoundedJsonBody, NdjsonBody, ChunkedBody,
+    UploadFile
+)
 
 __all__ = [
     'Resolver', 'StandardResolver',
-    'RequestBody', 'JsonBody'
+    'RequestBody', 'JsonBody', 
+    'StreamBody', 'BoundedJsonBody', 'NdjsonBody', 'ChunkedBody',
+    'UploadFile',
+    'ConversionError', 'InvalidArgumentsError', 'register_converter'
 ]
@@ -0,0 +1,126 @@
+__author__ = 'deadblue'
+
+import io
+import logging
+import mmap
+from tempfile import SpooledTemporaryFile
+from typing import Any, List, Type
+
+from werkzeug.exceptions import RequestEntityTooLarge
+from werkzeug.formparser import FormDataParser
+
+
+_logger = logging.getLogger(__name__)
+
+
+class SpooledPart(SpooledTemporaryFile):
+    """
+    Temporary file for an uploaded part, it stays in memory until its size 
+    exceeds threshold, and rejects the request when it is too large.
+    """
+
+    _max_part_size: int | None
+    _size: int
+    # Views returned by `getbuffer`, and memory maps under them
+    _exports: List[memoryview | mmap.mmap]
+
+    def __init__(self, memory_threshold: int, max_part_size: int | None) -> None:
+        super().__init__(max_size=memory_threshold)
+        self._max_part_size = max_part_size
+        self._size = 0
+        self._exports = []
+
+    def write(self, s: bytes) -> int:
+        self._size += len(s)
+        if self._max_part_size is not None and self._size > self._max_part_size:
+            raise RequestEntityTooLarge()
+        return super().write(s)
+
+    @property
+    def in_memory(self) -> bool:
+        return not self._rolled
+
+    def getbuffer(self) -> memoryview:
+        """
+        Zero-copy view of the whole content.
+        """
+        if self.in_memory:
+            view = self._file.getbuffer()
+        elif self._size == 0:
+            return memoryview(b'')
+        else:
+            mm = mmap.mmap(self.fileno(), 0, access=mmap.ACCESS_READ)
+            self._exports.append(mm)
+            view = memoryview(mm)
+        self._exports.append(view)
+        return view
+
+    def close(self) -> None:
+        # Release views before closing, otherwise closing raises BufferError
+        exports, self._exports = self._exports, []
+        for export in reversed(exports):
+            try:
+                if isinstance(export, memoryview):
+                    export.release()
+                else:
+                    export.close()
+            except BufferError:
+                # A slice of view is still alive, it keeps the memory map
+                pass
+        try:
+            super().close()
+        except BufferError:
+            # A slice of view is still alive, detach the buffer and leave it 
+            # to be freed with the slice.
+            _logger.debug('Upload buffer is still in use when closing')
+            self._file = io.BytesIO()
+            super().close()
+
+
+class UploadParserFactory:
+    """
+    Make FormDataParser which spools parts with limits, it is used as 
+    `form_data_parser_class` of request.
+    """
+
+    memory_threshold: int
+    max_part_size: int | None
+    max_request_size: int | None
+
+    def __init__(
+            self, 
+            memory_threshold: int, 
+            max_part_size: int | None, 
+            max_request_size: int | None
+        ) -> None:
+        self.memory_threshold = memory_threshold
+        self.max_part_size = max_part_size
+        self.max_request_size = max_request_size
+
+    def _make_part(self, *args: Any, **kwargs: Any) -> SpooledPart:
+        return SpooledPart(self.memory_threshold, self.max_part_size)
+
+    def __call__(
+            self, 
+            stream_factory: Any = None, 
+            max_content_length: int | None = None, 
+            **kwargs: Any
+        ) -> FormDataParser:
+        if self.max_request_size is not None:
+            max_content_length = self.max_request_size if max_content_length is None \
+                else min(max_content_length, self.max_request_size)
+        return FormDataParser(
+            stream_factory=self._make_part,
+            max_content_length=max_content_length,
+            **kwargs
+        )
+
+
+def merge_limits(file_types: List[Type]) -> UploadParserFactory:
+    def loosest(values: List[int | None]) -> int | None:
+        return None if None in values else max(values)
+    return UploadParserFactory(
+        memory_threshold=min(ft.memory_threshold for ft in file_types),
+        max_part_size=loosest([ft.max_part_size for ft in file_types]),
+        max_request_size=loosest([ft.max_request_size for ft in file_types])
+    )
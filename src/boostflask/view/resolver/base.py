@@ -28,6 +28,20 @@ class Resolver(ABC):
             self._handler_args.append(HandlerArg(
                 name=arg_name, type_=arg_type
             ))
+        self._compile_handler_args()
+
+    def _compile_handler_args(self):
+        """
+        Hook for preparing resolving work, called after handler is parsed.
+        """
+        pass
 
     @abstractmethod
     def resolve_args(self, *args, **kwargs) -> Dict[str, Any]: pass
+
+    async def resolve_args_async(self, *args, **kwargs) -> Dict[str, Any]:
+        """
+        Resolve arguments for async handler, override it when resolver needs 
+        to await something.
+        """
+        return self.resolve_args(*args, **kwargs)
@@ -0,0 +1,390 @@
+__author__ = 'deadblue'
+
+import dataclasses
+import datetime
+import json
+from decimal import Decimal, InvalidOperation
+from enum import Enum
+from typing import (
+    Any, Callable, Dict, Iterable, List, Tuple, Type, TypeVar, Union,
+    get_args, get_origin, get_type_hints
+)
+from types import NoneType, UnionType
+from uuid import UUID
+
+from werkzeug.exceptions import BadRequest
+
+
+T = TypeVar('T')
+
+ConverterType = Callable[[str], Any]
+"""
+Converter converts a string value from querystring or form to argument value.
+"""
+
+# Convert a decoded JSON value, the second argument is path of the value
+JsonConverterType = Callable[[Any, str], Any]
+
+
+class ConversionError(Exception):
+
+    path: str
+    """
+    Path of the invalid value, e.g.: "name" or "body.items[0].count".
+    """
+
+    reason: str
+
+    def __init__(self, path: str, reason: str) -> None:
+        self.path = path
+        self.reason = reason
+        super().__init__(f'{path}: {reason}')
+
+
+class InvalidArgumentsError(BadRequest):
+    """
+    Raised when handler arguments can not be converted from request, responds
+    400 with JSON body that lists all errors.
+    """
+
+    errors: List[ConversionError]
+
+    def __init__(self, errors: List[ConversionError]) -> None:
+        self.errors = errors
+        super().__init__(description='; '.join(str(e) for e in errors))
+
+    def get_body(self, environ: Any = None, scope: Any = None) -> str:
+        return json.dumps({
+            'code': self.code,
+            'errors': [
+                {'path': e.path, 'reason': e.reason} for e in self.errors
+            ]
+        })
+
+    def get_headers(
+            self, environ: Any = None, scope: Any = None
+        ) -> List[Tuple[str, str]]:
+        return [('Content-Type', 'application/json; charset=utf-8')]
+
+
+def _to_bool(val_str: str) -> bool:
+    return val_str.lower() == 'true' or val_str == '1'
+
+
+def _to_int(val_str: str) -> int:
+    return int(val_str, base=10)
+
+
+def _to_decimal(val_str: str) -> Decimal:
+    try:
+        return Decimal(val_str)
+    except InvalidOperation:
+        raise ValueError(f'invalid decimal: {val_str!r}')
+
+
+_registry: Dict[Type, ConverterType] = {
+    str: str,
+    int: _to_int,
+    float: float,
+    bool: _to_bool,
+    Decimal: _to_decimal,
+    UUID: UUID,
+    datetime.datetime: datetime.datetime.fromisoformat,
+    datetime.date: datetime.date.fromisoformat,
+    datetime.time: datetime.time.fromisoformat,
+}
+
+
+def register_converter(cls: Type[T], converter: Callable[[str], T]):
+    """
+    Register converter for argument type, the converter also works for the
+    subclasses of the type.
+
+    Converter should raise ValueError when value is invalid. Only handlers
+    parsed after registering are affected.
+
+    Args:
+        cls (Type[T]): Argument type.
+        converter (Callable[[str], T]): Function converts string to value.
+    """
+    _registry[cls] = converter
+
+
+def _make_enum_converter(enum_cls: Type[Enum]) -> ConverterType:
+    value_type = type(next(iter(enum_cls)).value) if len(enum_cls) > 0 else str
+    value_converter = _registry.get(value_type, str)
+    def convert(val_str: str) -> Enum:
+        # By value, then by name
+        try:
+            return enum_cls(value_converter(val_str))
+        except (ValueError, TypeError):
+            pass
+        try:
+            return enum_cls[val_str]
+        except KeyError:
+            raise ValueError(f'not a member of {enum_cls.__name__}')
+    return convert
+
+
+def _find_converter(cls: Type) -> ConverterType | None:
+    converter = _registry.get(cls, None)
+    if converter is not None:
+        return converter
+    if issubclass(cls, Enum):
+        return _make_enum_converter(cls)
+    for base in cls.__mro__[1:]:
+        converter = _registry.get(base, None)
+        if converter is not None:
+            return converter
+    return None
+
+
+def _unwrap_optional(annotation: Any) -> Tuple[Any, ...]:
+    if isinstance(annotation, UnionType) or get_origin(annotation) is Union:
+        return tuple(arg for arg in get_args(annotation) if arg is not NoneType)
+    return (annotation, )
+
+
+def compile_converter(annotation: Any) -> ConverterType | None:
+    """
+    Compile a converter for single value argument.
+
+    Args:
+        annotation (Any): Argument annotation.
+
+    Returns:
+        ConverterType | None: Converter, or None when no converter supports
+            the annotation.
+    """
+    if annotation is None or annotation is Any:
+        return str
+    candidates = _unwrap_optional(annotation)
+    if len(candidates) > 1:
+        converters = [compile_converter(c) for c in candidates]
+        converters = [c for c in converters if c is not None]
+        if len(converters) == 0:
+            return None
+        def convert_union(val_str: str) -> Any:
+            for converter in converters:
+                try:
+                    return converter(val_str)
+                except (ValueError, TypeError):
+                    pass
+            raise ValueError('no type of union matches')
+        return convert_union
+    annotation = candidates[0]
+    if not isinstance(annotation, type):
+        return None
+    return _find_converter(annotation)
+
+
+_MULTI_VALUE_TYPES = (list, tuple, set, frozenset)
+
+
+def is_multi_value(annotation: Any) -> bool:
+    """
+    Check argument takes multiple values, e.g.: `list[int]`.
+    """
+    candidates = _unwrap_optional(annotation)
+    if len(candidates) != 1:
+        return False
+    annotation = candidates[0]
+    return (get_origin(annotation) or annotation) in _MULTI_VALUE_TYPES
+
+
+def compile_multi_converter(
+        annotation: Any
+    ) -> Callable[[Iterable[str]], Any] | None:
+    """
+    Compile a converter for multiple value argument, the converter accepts
+    values of a repeated key.
+    """
+    annotation = _unwrap_optional(annotation)[0]
+    container = get_origin(annotation) or annotation
+    item_types = get_args(annotation)
+    item_type = item_types[0] if len(item_types) > 0 else str
+    converter = compile_converter(item_type)
+    if converter is None:
+        return None
+    def convert(values: Iterable[str]) -> Any:
+        return container(converter(value) for value in values)
+    return convert
+
+
+def is_json_body(annotation: Any) -> bool:
+    """
+    Check argument is resolved from JSON body, that is a dataclass, optional 
+    dataclass, or container of them, e.g.: `list[Item] | None`.
+    """
+    candidates = _unwrap_optional(annotation)
+    if len(candidates) != 1:
+        return False
+    annotation = candidates[0]
+    if dataclasses.is_dataclass(annotation):
+        return True
+    origin = get_origin(annotation)
+    if origin in _MULTI_VALUE_TYPES:
+        item_types = get_args(annotation)
+        return len(item_types) > 0 and is_json_body(item_types[0])
+    if origin is dict:
+        kv_types = get_args(annotation)
+        return len(kv_types) > 1 and is_json_body(kv_types[1])
+    return False
+
+
+# Compiled JSON converters of dataclasses
+_json_cache: Dict[Type, JsonConverterType] = {}
+
+
+def _identity(value: Any, path: str) -> Any:
+    return value
+
+
+def _make_json_scalar(cls: Type) -> JsonConverterType:
+    if cls is bool:
+        accepted = (bool, )
+    elif cls is int:
+        accepted = (int, )
+    elif cls is float:
+        accepted = (int, float)
+    elif cls is str:
+        accepted = (str, )
+    else:
+        accepted = (cls, )
+    if cls in (bool, int, float, str):
+        converter = None
+    elif issubclass(cls, Enum):
+        converter = _make_json_enum(cls)
+    else:
+        converter = _find_converter(cls)
+    type_name = cls.__name__
+    def convert(value: Any, path: str) -> Any:
+        if isinstance(value, accepted) and (
+            cls is bool or not isinstance(value, bool)
+        ):
+            return float(value) if cls is float else value
+        if converter is not None and isinstance(value, (str, int)):
+            try:
+                return converter(value)
+            except (ValueError, TypeError):
+                pass
+        raise ConversionError(path, f'expected {type_name}')
+    return convert
+
+
+def _make_json_enum(enum_cls: Type[Enum]) -> Callable[[Any], Enum]:
+    def convert(value: Any) -> Enum:
+        try:
+            return enum_cls(value)
+        except ValueError:
+            if isinstance(value, str) and value in enum_cls.__members__:
+                return enum_cls[value]
+            raise
+    return convert
+
+
+def _make_json_dataclass(cls: Type) -> JsonConverterType:
+    fields: List[Tuple[str, JsonConverterType, bool]] = []
+    def convert(value: Any, path: str) -> Any:
+        if not isinstance(value, dict):
+            raise ConversionError(path, 'expected object')
+        kwargs, errors = {}, []
+        for name, converter, required in fields:
+            field_path = f'{path}.{name}'
+            if name not in value:
+                if required:
+                    errors.append(ConversionError(field_path, 'missing field'))
+                continue
+            try:
+                kwargs[name] = converter(value[name], field_path)
+            except InvalidArgumentsError as e:
+                errors.extend(e.errors)
+            except ConversionError as e:
+                errors.append(e)
+        if len(errors) > 0:
+            raise InvalidArgumentsError(errors)
+        return cls(**kwargs)
+    # Put converter before compiling fields, for self-referencing dataclass
+    _json_cache[cls] = convert
+    hints = get_type_hints(cls)
+    for field in dataclasses.fields(cls):
+        if not field.init: continue
+        required = (
+            field.default is dataclasses.MISSING and
+            field.default_factory is dataclasses.MISSING
+        )
+        fields.append((
+            field.name, compile_json_converter(hints.get(field.name, Any)), required
+        ))
+    return convert
+
+
+def compile_json_converter(annotation: Any) -> JsonConverterType:
+    """
+    Compile a converter for decoded JSON value, which validates the value and
+    builds dataclasses in it.
+
+    Args:
+        annotation (Any): Type of JSON value.
+
+    Returns:
+        JsonConverterType: Converter.
+    """
+    if annotation is None or annotation is Any:
+        return _identity
+    candidates = _unwrap_optional(annotation)
+    if len(candidates) != 1 or candidates[0] is not annotation:
+        nullable = NoneType in get_args(annotation)
+        converters = [compile_json_converter(c) for c in candidates]
+        def convert_union(value: Any, path: str) -> Any:
+            if value is None and nullable:
+                return None
+            error = None
+            for converter in converters:
+                try:
+                    return converter(value, path)
+                except (ConversionError, InvalidArgumentsError) as e:
+                    error = error or e
+            raise error
+        return convert_union
+    origin = get_origin(annotation) or annotation
+    if origin in _MULTI_VALUE_TYPES:
+        item_types = get_args(annotation)
+        item_converter = compile_json_converter(
+            item_types[0] if len(item_types) > 0 else Any
+        )
+        def convert_list(value: Any, path: str) -> Any:
+            if not isinstance(value, list):
+                raise ConversionError(path, 'expected array')
+            items, errors = [], []
+            for index, item in enumerate(value):
+                try:
+                    items.append(item_converter(item, f'{path}[{index}]'))
+                except InvalidArgumentsError as e:
+                    errors.extend(e.errors)
+                except ConversionError as e:
+                    errors.append(e)
+            if len(errors) > 0:
+                raise InvalidArgumentsError(errors)
+            return items if origin is list else origin(items)
+        return convert_list
+    if origin is dict:
+        kv_types = get_args(annotation)
+        value_converter = compile_json_converter(
+            kv_types[1] if len(kv_types) > 1 else Any
+        )
+        def convert_dict(value: Any, path: str) -> Any:
+            if not isinstance(value, dict):
+                raise ConversionError(path, 'expected object')
+            return {
+                k: value_converter(v, f'{path}.{k}') for k, v in value.items()
+            }
+        return convert_dict
+    if dataclasses.is_dataclass(annotation):
+        converter = _json_cache.get(annotation, None)
+        if converter is None:
+            converter = _make_json_dataclass(annotation)
+        return converter
+    if isinstance(annotation, type):
+        return _make_json_scalar(annotation)
+    return _identity
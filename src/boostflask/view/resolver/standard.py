@@ -1,14 +1,22 @@
 __author__ = 'deadblue'
 
 import logging
-from typing import Any, Dict
+from typing import Any, Callable, Dict, List, Tuple
 
 from flask import request
+from werkzeug.datastructures import MultiDict
+from werkzeug.exceptions import RequestEntityTooLarge
 
-from boostflask._typing import is_subclass, cast_value
+from boostflask._typing import is_subclass
 from boostflask._utils import to_camel
-from .base import Resolver
-from .types import RequestBody
+from .base import HandlerArg, Resolver
+from .converter import (
+    ConversionError, InvalidArgumentsError, 
+    compile_converter, compile_json_converter, compile_multi_converter, 
+    is_json_body, is_multi_value
+)
+from .types import RequestBody, StreamBody, UploadFile
+from ._upload import UploadParserFactory, merge_limits
 
 
 
@@ -22,8 +30,124 @@ _FORM_MIME_TYPES = {
 _logger = logging.getLogger(__name__)
 
 
+_MISSING = object()
+
+# Extract argument value from querystring and form
+ExtractorType = Callable[[MultiDict, MultiDict | None], Any]
+
+
+def _extract_none(args: MultiDict, form: MultiDict | None) -> Any:
+    # Leave argument to its default value
+    return _MISSING
+
+
+def _warn_unsupported(ha: HandlerArg):
+    _logger.warning(
+        'No converter for argument %s: %r, it will not be resolved from request.',
+        ha.name, ha.type_
+    )
+
+
 class StandardResolver(Resolver):
 
+    # Argument name and its extractor
+    _extractors: List[Tuple[str, ExtractorType]]
+    _upload_parser: UploadParserFactory | None = None
+    _warned_parsed_form: bool = False
+
+    def _compile_handler_args(self):
+        self._extractors = [
+            (ha.name, self._compile_extractor(ha)) 
+            for ha in self._handler_args
+        ]
+        file_types = [
+            ha.type_ for ha in self._handler_args 
+            if is_subclass(ha.type_, UploadFile)
+        ]
+        if len(file_types) > 0:
+            self._upload_parser = merge_limits(file_types)
+
+    def _compile_extractor(self, ha: HandlerArg) -> ExtractorType:
+        arg_name = ha.name
+        arg_alias = to_camel(arg_name)
+        names = (arg_name, ) if arg_alias == arg_name else (arg_name, arg_alias)
+        # Resolve argument from uploaded files, by name or alias
+        if is_subclass(ha.type_, UploadFile):
+            file_type = ha.type_
+            def extract_file(args: MultiDict, form: MultiDict | None) -> Any:
+                files = request.files
+                for name in names:
+                    if name in files:
+                        arg_value: UploadFile = file_type()
+                        arg_value.set_file(files[name])
+                        return arg_value
+                return _MISSING
+            return extract_file
+        # Handle special argument type
+        if is_subclass(ha.type_, StreamBody):
+            stream_type = ha.type_
+            def extract_stream(args: MultiDict, form: MultiDict | None) -> Any:
+                arg_value: StreamBody = stream_type()
+                arg_value.set_stream(request.stream, request.content_length)
+                return arg_value
+            return extract_stream
+        if is_subclass(ha.type_, RequestBody):
+            body_type = ha.type_
+            def extract_body(args: MultiDict, form: MultiDict | None) -> Any:
+                arg_value: RequestBody = body_type()
+                arg_value.set_body(request.data)
+                return arg_value
+            return extract_body
+        # Resolve dataclass argument from JSON body, including optional 
+        # dataclass and container of dataclasses
+        if is_json_body(ha.type_):
+            convert_json = compile_json_converter(ha.type_)
+            def extract_json(args: MultiDict, form: MultiDict | None) -> Any:
+                if not request.is_json:
+                    return _MISSING
+                return convert_json(request.get_json(), arg_name)
+            return extract_json
+        # Resolve multi-value argument from querystring or form
+        if is_multi_value(ha.type_):
+            convert_all = compile_multi_converter(ha.type_)
+            if convert_all is None:
+                _warn_unsupported(ha)
+                return _extract_none
+            def extract_list(args: MultiDict, form: MultiDict | None) -> Any:
+                for source in (form, args):
+                    if source is None: continue
+                    for name in names:
+                        if name not in source: continue
+                        try:
+                            return convert_all(source.getlist(name))
+                        except (ValueError, TypeError) as e:
+                            raise ConversionError(arg_name, str(e))
+                return _MISSING
+            return extract_list
+        # Resolve argument from querystring then form, by name or alias
+        convert = compile_converter(ha.type_)
+        if convert is None:
+            _warn_unsupported(ha)
+            return _extract_none
+        def extract(args: MultiDict, form: MultiDict | None) -> Any:
+            arg_value = None
+            for name in names:
+                if name in args:
+                    arg_value = args[name]
+                    break
+            if form is not None:
+                for name in names:
+                    if name in form:
+                        arg_value = form[name]
+                        break
+            if arg_value is None:
+                return _MISSING
+            try:
+                return convert(arg_value)
+            except (ValueError, TypeError) as e:
+                raise ConversionError(arg_name, str(e))
+        return extract
+
     def resolve_args(self, *args: Any, **kwargs: Any) -> Dict[str, Any]:
         handler_args_count = len(self._handler_args)
         # Fast-path
@@ -59,33 +183,46 @@ class StandardResolver(Resolver):
             call_args: Dict[str, Any], 
             skip_count: int
         ):
+        if self._upload_parser is not None:
+            self._prepare_upload()
         # Parse HTTP form
-        form = request.form if request.mimetype in _FORM_MIME_TYPES else {}
-        # Fill call args
-        for ha in self._handler_args[skip_count:]:
+        form = request.form if request.mimetype in _FORM_MIME_TYPES else None
+        args = request.args
+        # Fill call args, and collect all conversion errors
+        errors = None
+        for name, extract in self._extractors[skip_count:]:
             # Skip already set argument
-            if ha.name in call_args:
+            if name in call_args: continue
+            try:
+                arg_value = extract(args, form)
+            except ConversionError as e:
+                errors = errors or []
+                errors.append(e)
                 continue
-            # Handle special argument type
-            if is_subclass(ha.type_, RequestBody):
-                arg_value: RequestBody = ha.type_()
-                arg_value.set_body(request.data)
-                call_args[ha.name] = arg_value
+            except InvalidArgumentsError as e:
+                errors = errors or []
+                errors.extend(e.errors)
                 continue
-            # Resolve argument from request
-            arg_alias = to_camel(ha.name)
-            arg_value = None
-            # Search from querystring
-            if ha.name in request.args:
-                arg_value = request.args.get(ha.name)
-            elif arg_alias in request.args:
-                arg_value = request.args.get(arg_alias)
-            # Search from form
-            if ha.name in form:
-                arg_value = form.get(ha.name)
-            elif arg_alias in form:
-                arg_value = form.get(arg_alias)
-            # Cast argument value
-            if arg_value is not None:
-                call_args[ha.name] = cast_value(arg_value, ha.type_)
-            # TODO: Support files
+            if arg_value is not _MISSING:
+                call_args[name] = arg_value
+        if errors is not None:
+            raise InvalidArgumentsError(errors)
+
+    def _prepare_upload(self):
+        req = request._get_current_object()
+        # Reject too large request before reading it
+        max_size = self._upload_parser.max_request_size
+        if max_size is not None and \
+            req.content_length is not None and req.content_length > max_size:
+            raise RequestEntityTooLarge()
+        if 'form' in req.__dict__:
+            # Form is parsed before resolving, the parser can not take effect
+            if not self._warned_parsed_form:
+                self._warned_parsed_form = True
+                _logger.warning(
+                    'Form is parsed before resolving upload files, '
+                    'spooling and request size limit are not applied.'
+                )
+            return
+        # Spool uploaded files with limits when parsing form
+        req.form_data_parser_class = self._upload_parser
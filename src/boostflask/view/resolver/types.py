@@ -1,11 +1,15 @@
 __author__ = 'deadblue'
 
+import io
 import json
 from abc import ABC, abstractmethod
 from typing import (
-    Any, Dict
+    IO, Any, ClassVar, Dict, Iterator
 )
 
+from werkzeug.datastructures import FileStorage
+from werkzeug.exceptions import RequestEntityTooLarge
+
 
 class RequestBody(ABC):
 
@@ -22,3 +26,185 @@ class JsonBody(RequestBody):
 
     def get_json(self) -> Dict[str, Any]:
         return self._json
+
+
+class StreamBody(RequestBody, ABC):
+    """
+    Request body which reads from request stream, instead of pre-read bytes.
+    """
+
+    @abstractmethod
+    def set_stream(self, stream: IO[bytes], content_length: int | None) -> None: ...
+
+    def set_body(self, body: bytes) -> None:
+        self.set_stream(io.BytesIO(body), len(body))
+
+
+def _buffered(stream: IO[bytes]) -> IO[bytes]:
+    # Raw stream (e.g. LimitedStream of werkzeug) may return short reads, and
+    # reads one byte per call in readline
+    if isinstance(stream, io.RawIOBase):
+        return io.BufferedReader(stream)
+    return stream
+
+
+class BoundedJsonBody(StreamBody):
+    """
+    JSON body with size limit, oversize body is rejected before reading it 
+    when request has content length.
+    """
+
+    max_size: ClassVar[int] = 1024 * 1024
+    """
+    Maximum size in bytes of body.
+    """
+
+    _json: Any
+
+    def set_stream(self, stream: IO[bytes], content_length: int | None) -> None:
+        if content_length is not None and content_length > self.max_size:
+            raise RequestEntityTooLarge()
+        # Read until EOF or size limit exceeded
+        body = _buffered(stream).read(self.max_size + 1)
+        if len(body) > self.max_size:
+            raise RequestEntityTooLarge()
+        self._json = json.loads(body)
+
+    def get_json(self) -> Any:
+        return self._json
+
+
+class NdjsonBody(StreamBody):
+    """
+    Newline-delimited JSON body, records are parsed one by one when iterating.
+    """
+
+    max_line_size: ClassVar[int] = 1024 * 1024
+    """
+    Maximum size in bytes of one record.
+    """
+
+    _stream: IO[bytes]
+
+    def set_stream(self, stream: IO[bytes], content_length: int | None) -> None:
+        self._stream = _buffered(stream)
+
+    def __iter__(self) -> Iterator[Any]:
+        while True:
+            line = self._stream.readline(self.max_line_size + 1)
+            if len(line) == 0:
+                break
+            # Line ending is not counted in record size
+            if len(line.rstrip(b'\r\n')) > self.max_line_size:
+                raise RequestEntityTooLarge()
+            line = line.strip()
+            if len(line) > 0:
+                yield json.loads(line)
+
+
+class ChunkedBody(StreamBody):
+    """
+    Raw body which is read chunk by chunk when iterating.
+    """
+
+    chunk_size: ClassVar[int] = 64 * 1024
+    """
+    Maximum size in bytes of each chunk.
+    """
+
+    _stream: IO[bytes]
+
+    def set_stream(self, stream: IO[bytes], content_length: int | None) -> None:
+        self._stream = stream
+
+    def __iter__(self) -> Iterator[bytes]:
+        while True:
+            chunk = self._stream.read(self.chunk_size)
+            if len(chunk) == 0:
+                break
+            yield chunk
+
+
+class UploadFile(RequestBody):
+    """
+    Uploaded file from multipart form, the form field name is the argument 
+    name or its camel-case alias.
+
+    File content is spooled to temporary file when it is larger than 
+    `memory_threshold`. Subclass it to change limits, for example:
+
+    ```
+    class Avatar(UploadFile):
+        max_part_size = 1024 * 1024
+    ```
+
+    Spooling and request size limit take effect only when the form is parsed 
+    by the handler resolver. When the form is already parsed before that, 
+    e.g. by accessing `request.form` in a `before_request` function, files 
+    are stored in the default way and a warning is logged.
+    """
+
+    memory_threshold: ClassVar[int] = 512 * 1024
+    """
+    Maximum size in bytes of file which is kept in memory.
+    """
+
+    max_part_size: ClassVar[int | None] = None
+    """
+    Maximum size in bytes of file, None means unlimited.
+    """
+
+    max_request_size: ClassVar[int | None] = None
+    """
+    Maximum size in bytes of whole request, None means unlimited.
+    """
+
+    _storage: FileStorage
+    _size: int
+
+    def set_body(self, body: bytes) -> None:
+        self.set_file(FileStorage(io.BytesIO(body)))
+
+    def set_file(self, storage: FileStorage) -> None:
+        self._storage = storage
+        stream = storage.stream
+        stream.seek(0, 2)
+        self._size = stream.tell()
+        stream.seek(0)
+        if self.max_part_size is not None and self._size > self.max_part_size:
+            raise RequestEntityTooLarge()
+
+    @property
+    def filename(self) -> str | None:
+        return self._storage.filename
+
+    @property
+    def content_type(self) -> str | None:
+        return self._storage.content_type
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    @property
+    def stream(self) -> IO[bytes]:
+        return self._storage.stream
+
+    def read(self, size: int = -1) -> bytes:
+        return self._storage.stream.read(size)
+
+    def getbuffer(self) -> memoryview:
+        """
+        Zero-copy view of file content, the content is memory-mapped when 
+        it is spooled to disk.
+
+        Returns:
+            memoryview: View of file content.
+        """
+        stream = self._storage.stream
+        if hasattr(stream, 'getbuffer'):
+            return stream.getbuffer()
+        return memoryview(self.read())
+
+    def save(self, dst: str) -> None:
+        self._storage.save(dst)